@@ -1,60 +1,135 @@
 import logging
+import time
 
+import anthropic
 from anthropic.types import TextBlock
 
+from src.archive import get_archive
 from src.config import Config
+from src.deadline import Deadline, DeadlineExceeded
 from src.prompts import (
     FELIX,
-    NATIONAL_DAYS_PROMPT,
     PEARL,
-    WEATHER_PROMPT,
     CharacterInfo,
+    get_prompt_templates,
     get_system_prompt,
 )
+from src.rate_limit import get_rate_limiter
 from src.services.national_days import NationalDay
 from src.services.weather import (
     PRECIPITATION_CHANCE_THRESHOLD,
     DailyForecast,
     WeatherData,
 )
+from src.tokens import estimate_tokens
 
 logger = logging.getLogger(__name__)
 
-
-def generate_message_with_claude(config: Config, prompt: str, character: CharacterInfo) -> str:
+CLAUDE_TIMEOUT_SECONDS = 30
+CLAUDE_MAX_RETRIES = 2
+CLAUDE_RETRY_BACKOFF_SECONDS = 0.5  # Doubled for each retry; 429s wait for the rate limiter
+RETRYABLE_STATUS_CODES = (408, 409, 429)  # Besides any 5xx, as the SDK retries
+HTTP_SERVER_ERROR = 500
+CLAUDE_MAX_TOKENS = 1000
+# Minimum generation budget worth attempting a Claude request with
+GENERATION_MIN_BUDGET_SECONDS = 5
+# Budget kept back from generation so the message (or its fallback) can still be sent
+SEND_RESERVE_SECONDS = 5
+
+
+def generate_message_with_claude(
+    config: Config, prompt: str, character: CharacterInfo, deadline: Deadline
+) -> str:
     """
     Generate a message using Claude from a character's perspective.
     Args:
         config: Config object
         prompt: The prompt to send to Claude
         character: Dictionary containing character information
+        deadline: Invocation deadline bounding the request timeout
     Returns:
         The generated message or None if there's an error.
     """
-    response = config.claude_client.messages.create(
-        model="claude-3-5-haiku-latest",
-        max_tokens=1000,
-        temperature=0.75,
-        system=get_system_prompt(character),
-        messages=[{"role": "user", "content": prompt}],
+    generation_deadline = deadline.reserve(SEND_RESERVE_SECONDS)
+    if not generation_deadline.has_budget(GENERATION_MIN_BUDGET_SECONDS):
+        raise DeadlineExceeded("Generation budget exhausted")
+
+    system = get_system_prompt(character)
+    estimated_input_tokens = estimate_tokens(system) + estimate_tokens(prompt)
+    rate_limiter = get_rate_limiter()
+    # Retry here rather than in the SDK, so every attempt goes through the rate limiter
+    client = config.claude_client.with_options(max_retries=0)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug({"event": "claude_request", "character": character["name"], "prompt": prompt})
+    attempt = 0
+    while True:
+        attempt += 1
+        # Wait for room under the account's rate limits rather than being rejected with a 429
+        rate_limiter.acquire(estimated_input_tokens, CLAUDE_MAX_TOKENS, generation_deadline)
+        try:
+            timeout = generation_deadline.timeout(CLAUDE_TIMEOUT_SECONDS)
+            raw_response = client.with_options(timeout=timeout).messages.with_raw_response.create(
+                model="claude-3-5-haiku-latest",
+                max_tokens=CLAUDE_MAX_TOKENS,
+                temperature=0.75,
+                system=system,
+                messages=[{"role": "user", "content": prompt}],
+            )
+            break
+        except Exception as e:
+            rate_limiter.release(estimated_input_tokens, CLAUDE_MAX_TOKENS)
+            backoff = CLAUDE_RETRY_BACKOFF_SECONDS * 2 ** (attempt - 1)
+            if isinstance(e, anthropic.RateLimitError):
+                # The next acquire waits out the retry-after, for every caller in the process
+                rate_limiter.record_throttled(e.response.headers)
+                backoff = 0
+            if (
+                attempt > CLAUDE_MAX_RETRIES
+                or not is_retryable_error(e)
+                or not generation_deadline.has_budget(backoff + GENERATION_MIN_BUDGET_SECONDS)
+            ):
+                raise
+            logger.warning("⚠️ Claude request failed, retrying (attempt %s): %s", attempt + 1, e)
+            time.sleep(backoff)
+
+    response = raw_response.parse()
+    # Refund the unused reservation first; the headers then set the buckets they report on
+    rate_limiter.record_usage(
+        estimated_input_tokens,
+        CLAUDE_MAX_TOKENS,
+        response.usage.input_tokens,
+        response.usage.output_tokens,
     )
+    rate_limiter.update_from_headers(raw_response.headers)
     if isinstance(response.content[0], TextBlock):
         return response.content[0].text
     else:
-        logger.error(f"Unexpected response content: {response.content[0]}")
+        logger.error("Unexpected response content: %s", response.content[0])
         return str(response.content[0])
 
 
+def is_retryable_error(error: Exception) -> bool:
+    """Whether a failed Claude request is worth retrying: the errors the SDK would retry."""
+    if isinstance(error, anthropic.APIConnectionError):
+        return True
+    if isinstance(error, anthropic.APIStatusError):
+        return error.status_code in RETRYABLE_STATUS_CODES or error.status_code >= HTTP_SERVER_ERROR
+    return False
+
+
 def format_upcoming_forecast(upcoming: list[DailyForecast]) -> str:
     """Format the upcoming forecast days into a readable string."""
     forecast_lines = []
     for day in upcoming:
         precipitation_info = []
         if day["pop"] > PRECIPITATION_CHANCE_THRESHOLD:
-            if day["rain"] > 0:
+            if day["rain"]:
                 precipitation_info.append(f"{day['pop']:.0%} chance of rain")
-            if day["snow"] > 0:
+            if day["snow"]:
                 precipitation_info.append(f"{day['pop']:.0%} chance of snow")
+            # Without amounts the kind of precipitation is unknown
+            if day["rain"] is None and day["snow"] is None:
+                precipitation_info.append(f"{day['pop']:.0%} chance of precipitation")
 
         forecast_lines.append(
             f"- {day['date']:%A}: High {day['high']}°F, Low {day['low']}°F"
@@ -64,29 +139,42 @@ def format_upcoming_forecast(upcoming: list[DailyForecast]) -> str:
     return "\n".join(forecast_lines)
 
 
-def generate_weather_message(config: Config, weather_data: WeatherData) -> str | None:
-    """Generate a weather message using Claude with the provided weather data."""
-    try:
-        # Format the upcoming forecast section
-        upcoming_forecast = format_upcoming_forecast(weather_data["upcoming"])
-
-        # Format rain and snow information for today
-        rain_info = (
-            f", {weather_data['today']['rain']}mm rain expected"
-            if weather_data["today"]["rain"] > 0
-            else ""
-        )
-        snow_info = (
-            f", {weather_data['today']['snow']}mm snow expected"
-            if weather_data["today"]["snow"] > 0
-            else ""
-        )
+def build_weather_prompt(
+    location: str, weather_data: WeatherData, compact: bool | None = None, history: str = ""
+) -> str:
+    """
+    Build Pearl's weather prompt from the weather data and her recent message history.
+    Fields the provider didn't report are left out rather than shown as zeros.
+    """
+    # Format the upcoming forecast section
+    upcoming_forecast = format_upcoming_forecast(weather_data["upcoming"])
+
+    current = weather_data["current"]
+    feels_like_info = (
+        f" (feels like {current['feels_like']}°F)" if current["feels_like"] is not None else ""
+    )
+    gust_info = f" (gusts {current['wind_gust']}mph)" if current["wind_gust"] is not None else ""
+
+    # Format rain and snow information for today
+    rain_info = (
+        f", {weather_data['today']['rain']}mm rain expected"
+        if weather_data["today"]["rain"]
+        else ""
+    )
+    snow_info = (
+        f", {weather_data['today']['snow']}mm snow expected"
+        if weather_data["today"]["snow"]
+        else ""
+    )
 
-        prompt = WEATHER_PROMPT.format(
+    return (
+        get_prompt_templates(compact)["weather"].format(
             full_name=PEARL["full_name"],
             description=PEARL["description"],
-            location=config.weather_location,
-            current=weather_data["current"],
+            location=location,
+            current=current,
+            feels_like_info=feels_like_info,
+            gust_info=gust_info,
             today=weather_data["today"],
             upcoming_forecast=upcoming_forecast,
             sunrise=weather_data["sunrise"],
@@ -95,30 +183,64 @@ def generate_weather_message(config: Config, weather_data: WeatherData) -> str |
             rain_info=rain_info,
             snow_info=snow_info,
         )
-        return generate_message_with_claude(config, prompt, PEARL)
+        + history
+    )
+
+
+def generate_weather_message(
+    config: Config, weather_data: WeatherData, deadline: Deadline
+) -> str | None:
+    """Generate a weather message using Claude with the provided weather data."""
+    try:
+        history = get_archive().recent_history(config.tenant_id, PEARL["name"])
+        prompt = build_weather_prompt(config.weather_location, weather_data, history=history)
+        return generate_message_with_claude(config, prompt, PEARL, deadline)
     except Exception as e:
-        logger.error(f"Error generating weather message: {e!s}")
+        logger.error("Error generating weather message: %s", e)
         return None
 
 
-def generate_national_days_message(config: Config, national_days: list[NationalDay]) -> str | None:
+def format_national_day(day: NationalDay) -> str:
+    """Format a national day and any details from its page as a prompt line."""
+    line = f"- {day.name}"
+    if day.summary:
+        line += f": {day.summary}"
+    # The occurrence sentence often comes from the summary's paragraph, so don't repeat it
+    if day.occurrence_text and day.occurrence_text not in (day.summary or ""):
+        line += f" When: {day.occurrence_text}"
+    if day.history:
+        line += f" History: {day.history}"
+    return line
+
+
+def build_national_days_prompt(
+    national_days: list[NationalDay], compact: bool | None = None, history: str = ""
+) -> str:
+    """Build Felix's national days prompt from the national days and his recent messages."""
+    days_text = "\n".join([format_national_day(day) for day in national_days])
+    prompt = get_prompt_templates(compact)["national_days"].format(
+        full_name=FELIX["full_name"], description=FELIX["description"], days_text=days_text
+    )
+    return prompt + history
+
+
+def generate_national_days_message(
+    config: Config, national_days: list[NationalDay], deadline: Deadline
+) -> str | None:
     """
     Generate a national days message using Claude.
     Args:
         config: Config object
         national_days: List of NationalDay objects
+        deadline: Invocation deadline bounding the Claude request
     Returns:
         The generated national days message or None if there's an error.
     """
     try:
-        # Format national days for the prompt
-        days_text = "\n".join([f"- {day.name}" for day in national_days])
-        prompt = NATIONAL_DAYS_PROMPT.format(
-            full_name=FELIX["full_name"], description=FELIX["description"], days_text=days_text
-        )
-
-        return generate_message_with_claude(config, prompt, FELIX)
+        history = get_archive().recent_history(config.tenant_id, FELIX["name"])
+        prompt = build_national_days_prompt(national_days, history=history)
+        return generate_message_with_claude(config, prompt, FELIX, deadline)
 
     except Exception as e:
-        logger.error(f"Error generating national days message: {e!s}")
+        logger.error("Error generating national days message: %s", e)
         return None
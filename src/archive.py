@@ -0,0 +1,273 @@
+"""
+Append-only archive of every message Felix and Pearl have sent.
+
+Messages are kept as gzip-compressed JSON lines, partitioned by tenant, character and
+date, with each day's partition compressed as a single stream:
+
+    {tenant_id}/{character}/{YYYY-MM-DD}.jsonl.gz
+
+Partitions are kept in the S3 bucket named by ARCHIVE_BUCKET (as deployed), or under
+ARCHIVE_DIR for local runs. Lambda's /tmp doesn't survive until the next daily run,
+so the history is only durable with ARCHIVE_BUCKET and a STATE_TABLE for the index.
+
+A small index per tenant and character is kept in the state store with the most
+recent messages, so "last N messages" lookups for prompts cost a single store read
+and never touch the partitions. Query the archive with:
+
+    python -m src.archive recent default Felix -n 5
+    python -m src.archive day default Pearl 2025-07-16
+"""
+
+import argparse
+import fcntl
+import gzip
+import json
+import logging
+import os
+import sys
+import time
+from collections.abc import Callable, Iterator
+from functools import cache
+from pathlib import Path
+from typing import Any, Protocol, TypedDict
+
+import boto3
+from botocore.exceptions import ClientError
+
+from src.store import UPDATE_ATTEMPTS, StateStore, StoreConflictError, get_store
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ARCHIVE_DIR = "/tmp/felix-pearl-archive"
+INDEX_SIZE = 20  # Recent messages kept in each index
+# Bounds on the history snippet added to prompts
+RECENT_HISTORY_MESSAGES = 3
+RECENT_HISTORY_MESSAGE_CHARS = 240
+
+
+class ArchivedMessage(TypedDict):
+    tenant_id: str
+    character: str
+    date: str
+    message_id: str
+    sent_at: float
+    message: str
+
+
+class PartitionStorage(Protocol):
+    """Where the gzip-compressed partitions are kept."""
+
+    def update(self, key: str, func: Callable[[bytes | None], bytes]) -> None:
+        """
+        Atomically replace the partition with func(current contents), creating it if
+        needed. func may be called more than once and must not have side effects.
+
+        Raises:
+            StoreConflictError: If the write kept conflicting with other writers
+        """
+        ...
+
+    def read(self, key: str) -> bytes | None:
+        """Read the whole partition, or None if it doesn't exist."""
+        ...
+
+
+class LocalPartitions:
+    """Partitions as files under a local directory, for local runs and the daemon."""
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+
+    def update(self, key: str, func: Callable[[bytes | None], bytes]) -> None:
+        path = self.directory / key
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # An exclusive lock on a sidecar file serializes writers across threads and processes
+        with open(path.with_name(path.name + ".lock"), "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            data = func(self.read(key))
+            # Write to a temporary file and rename so readers never see a partial partition
+            tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{time.monotonic_ns()}.tmp")
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, path)
+
+    def read(self, key: str) -> bytes | None:
+        path = self.directory / key
+        return path.read_bytes() if path.exists() else None
+
+
+class S3Partitions:
+    """
+    Partitions as objects in an S3 bucket. S3 can't append, so an update rewrites the
+    day's object; a partition only holds a character's few messages for one day. The
+    rewrite is conditional on the ETag that was read, so concurrent invocations retry
+    instead of overwriting each other's messages.
+    """
+
+    def __init__(self, bucket: str):
+        self.bucket = bucket
+        self.s3 = boto3.client("s3")
+
+    def update(self, key: str, func: Callable[[bytes | None], bytes]) -> None:
+        for _ in range(UPDATE_ATTEMPTS):
+            data, etag = self._get(key)
+            # Only replace the object we read, or only create it if there wasn't one
+            condition = {"IfMatch": etag} if etag else {"IfNoneMatch": "*"}
+            try:
+                self.s3.put_object(
+                    Bucket=self.bucket,
+                    Key=key,
+                    Body=func(data),
+                    ContentType="application/x-ndjson",
+                    ContentEncoding="gzip",
+                    **condition,
+                )
+                return
+            except ClientError as e:
+                if e.response["Error"]["Code"] not in (
+                    "PreconditionFailed",
+                    "ConditionalRequestConflict",
+                ):
+                    raise
+                logger.info("🔁 Concurrent write to %s, retrying", key)
+        raise StoreConflictError(f"Gave up updating {key} after {UPDATE_ATTEMPTS} attempts")
+
+    def read(self, key: str) -> bytes | None:
+        return self._get(key)[0]
+
+    def _get(self, key: str) -> tuple[bytes | None, str | None]:
+        """Read the object and its ETag, or (None, None) if it doesn't exist."""
+        try:
+            response = self.s3.get_object(Bucket=self.bucket, Key=key)
+        except ClientError as e:
+            if e.response["Error"]["Code"] in ("NoSuchKey", "404"):
+                return None, None
+            raise
+        return response["Body"].read(), response["ETag"]
+
+
+class MessageArchive:
+    """
+    Compressed, partitioned archive of sent messages with a recent-message index.
+    Failures are logged rather than raised, since the archive must never stop a post.
+    """
+
+    def __init__(self, partitions: PartitionStorage, store: StateStore):
+        self.partitions = partitions
+        self.store = store
+
+    def _partition_key(self, tenant_id: str, character: str, date: str) -> str:
+        return f"{tenant_id}/{character.lower()}/{date}.jsonl.gz"
+
+    def _index_key(self, tenant_id: str, character: str) -> str:
+        return f"archive_index:{tenant_id}:{character.lower()}"
+
+    def append(
+        self, tenant_id: str, character: str, date: str, message_id: str, message: str
+    ) -> None:
+        """Append a sent message to its partition and to the recent-message index."""
+        entry = ArchivedMessage(
+            tenant_id=tenant_id,
+            character=character,
+            date=date,
+            message_id=message_id,
+            sent_at=time.time(),
+            message=message,
+        )
+        try:
+            line = (json.dumps(entry, ensure_ascii=False) + "\n").encode("utf-8")
+
+            def add_line(data: bytes | None) -> bytes:
+                # Recompress the whole day, so it's one gzip stream rather than a member per line
+                return gzip.compress((gzip.decompress(data) if data else b"") + line)
+
+            def add_entry(index: dict[str, Any] | None) -> dict[str, Any]:
+                recent = index["recent"] if index else []
+                return {"recent": [*recent, entry][-INDEX_SIZE:]}
+
+            self.partitions.update(self._partition_key(tenant_id, character, date), add_line)
+            self.store.update(self._index_key(tenant_id, character), add_entry)
+        except Exception as e:
+            logger.error("❌ Failed to archive message %s: %s", message_id, e)
+
+    def recent(self, tenant_id: str, character: str, limit: int) -> list[ArchivedMessage]:
+        """Get the character's most recent messages, newest first, from the index."""
+        try:
+            index = self.store.get(self._index_key(tenant_id, character))
+        except Exception as e:
+            logger.error("❌ Failed to read message archive index: %s", e)
+            return []
+        if not index:
+            return []
+        return list(reversed(index["recent"][-limit:])) if limit > 0 else []
+
+    def read_day(self, tenant_id: str, character: str, date: str) -> Iterator[ArchivedMessage]:
+        """Read every message the character sent on a date, oldest first."""
+        data = self.partitions.read(self._partition_key(tenant_id, character, date))
+        if data is None:
+            return
+        for line in gzip.decompress(data).decode("utf-8").splitlines():
+            yield json.loads(line)
+
+    def recent_history(
+        self, tenant_id: str, character: str, limit: int = RECENT_HISTORY_MESSAGES
+    ) -> str:
+        """
+        A bounded snippet of the character's recent messages for a prompt, so Claude
+        can keep continuity and avoid repeating itself. Empty if there's no history.
+        """
+        messages = self.recent(tenant_id, character, limit)
+        if not messages:
+            return ""
+
+        lines = [f"- {entry['date']}: {truncate_message(entry['message'])}" for entry in messages]
+        return (
+            "\n\nYour most recent messages, for continuity. "
+            "Don't repeat their jokes, puns or phrasing:\n" + "\n".join(lines)
+        )
+
+
+def truncate_message(message: str, max_chars: int = RECENT_HISTORY_MESSAGE_CHARS) -> str:
+    """Collapse a message onto one line and truncate it for a prompt."""
+    text = " ".join(message.split())
+    return text if len(text) <= max_chars else text[: max_chars - 1].rstrip() + "…"
+
+
+@cache
+def get_archive() -> MessageArchive:
+    """
+    Get the message archive, indexed in the configured state store.
+    Uses the S3 bucket named by ARCHIVE_BUCKET if set, otherwise files under ARCHIVE_DIR.
+    """
+    partitions: PartitionStorage
+    if bucket := os.environ.get("ARCHIVE_BUCKET"):
+        logger.info("🗄️ Using S3 message archive: %s", bucket)
+        partitions = S3Partitions(bucket)
+    else:
+        partitions = LocalPartitions(os.environ.get("ARCHIVE_DIR", DEFAULT_ARCHIVE_DIR))
+    return MessageArchive(partitions, get_store())
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Query the message archive")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    recent_parser = subparsers.add_parser("recent", help="Show a character's latest messages")
+    recent_parser.add_argument("tenant_id")
+    recent_parser.add_argument("character")
+    recent_parser.add_argument("-n", type=int, default=5, help="Number of messages")
+    day_parser = subparsers.add_parser("day", help="Show a character's messages on a date")
+    day_parser.add_argument("tenant_id")
+    day_parser.add_argument("character")
+    day_parser.add_argument("date", help="Date of the messages, e.g. 2025-07-16")
+    args = parser.parse_args(argv)
+
+    archive = get_archive()
+    if args.command == "recent":
+        messages = archive.recent(args.tenant_id, args.character, args.n)
+    else:
+        messages = list(archive.read_day(args.tenant_id, args.character, args.date))
+    for entry in messages:
+        print(json.dumps(entry, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
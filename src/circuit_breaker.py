@@ -0,0 +1,186 @@
+import logging
+import time
+from collections.abc import Callable
+from typing import Any, TypedDict
+
+import requests
+
+from src.store import StateStore, get_store
+
+logger = logging.getLogger(__name__)
+
+FAILURE_THRESHOLD = 3  # Consecutive failures before the circuit opens
+COOLDOWN_SECONDS = 10 * 60  # How long an open circuit fails fast before probing again
+NEGATIVE_CACHE_SECONDS = 60  # How long any single failure fails fast, e.g. for manual reruns
+PROBE_TIMEOUT_SECONDS = 60  # How long a half-open probe may run before another is allowed
+STATE_TTL_SECONDS = 24 * 60 * 60
+HTTP_TOO_MANY_REQUESTS = 429
+HTTP_SERVER_ERROR = 500
+
+
+class CircuitOpenError(Exception):
+    """Raised when an upstream is known to be down and the call was skipped."""
+
+
+class CircuitState(TypedDict):
+    failures: int
+    opened_at: float | None
+    negative_until: float | None
+    probe_started_at: float | None
+
+
+CLOSED_STATE = CircuitState(failures=0, opened_at=None, negative_until=None, probe_started_at=None)
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker with a short-lived negative cache for a flaky upstream.
+
+    - Closed: calls go through. Every failure is negatively cached for
+      NEGATIVE_CACHE_SECONDS, and FAILURE_THRESHOLD consecutive failures open the circuit.
+    - Open: calls fail fast until COOLDOWN_SECONDS have passed since it opened.
+    - Half-open: after the cooldown a single probe call is let through; success closes
+      the circuit and failure reopens it for another cooldown.
+
+    State is persisted in the state store so it carries across invocations and is
+    shared by every tenant, so only failures of the upstream itself should be recorded
+    (see is_upstream_failure). Updates are conditional, so concurrent invocations never
+    lose each other's failures or both claim the probe.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        store: StateStore,
+        failure_threshold: int = FAILURE_THRESHOLD,
+        cooldown_seconds: float = COOLDOWN_SECONDS,
+        negative_cache_seconds: float = NEGATIVE_CACHE_SECONDS,
+    ):
+        self.name = name
+        self.store = store
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self.negative_cache_seconds = negative_cache_seconds
+
+    @property
+    def _key(self) -> str:
+        return f"circuit:{self.name}"
+
+    def _load(self) -> CircuitState:
+        try:
+            state = self.store.get(self._key)
+        except Exception as e:
+            logger.error("❌ Failed to read circuit state for %s: %s", self.name, e)
+            return CircuitState(**CLOSED_STATE)
+        return CircuitState(**state) if state else CircuitState(**CLOSED_STATE)
+
+    def _update(self, func: Callable[[CircuitState], CircuitState]) -> None:
+        """Conditionally replace the stored state with func(current state)."""
+
+        def apply(state: dict[str, Any] | None) -> dict[str, Any]:
+            return dict(func(CircuitState(**state) if state else CircuitState(**CLOSED_STATE)))
+
+        try:
+            self.store.update(self._key, apply, ttl_seconds=STATE_TTL_SECONDS)
+        except Exception as e:
+            logger.error("❌ Failed to save circuit state for %s: %s", self.name, e)
+
+    def allow(self) -> bool:
+        """Whether a call to the upstream should be attempted right now."""
+        state = self._load()
+        now = time.time()
+
+        if state["negative_until"] is not None and now < state["negative_until"]:
+            return False
+
+        if state["opened_at"] is None:
+            return True
+
+        if now < state["opened_at"] + self.cooldown_seconds:
+            return False
+
+        # Half-open: let a single probe through, claimed with a conditional update
+        claimed = False
+
+        def claim_probe(state: CircuitState) -> CircuitState:
+            nonlocal claimed
+            probe_started_at = state["probe_started_at"]
+            claimed = probe_started_at is None or now >= probe_started_at + PROBE_TIMEOUT_SECONDS
+            if claimed:
+                state["probe_started_at"] = now
+            return state
+
+        self._update(claim_probe)
+        if claimed:
+            logger.info("🔌 Circuit %s half-open, probing upstream", self.name)
+        return claimed
+
+    def check(self) -> None:
+        """
+        Raise if the upstream should not be called right now.
+
+        Raises:
+            CircuitOpenError: If the circuit is open or the last failure is negatively cached
+        """
+        if not self.allow():
+            raise CircuitOpenError(f"Circuit {self.name} is open, skipping call")
+
+    def record_success(self) -> None:
+        """Record a successful call, closing the circuit."""
+        state = self._load()
+        if state != CLOSED_STATE:
+            if state["opened_at"] is not None:
+                logger.info("🔌 Circuit %s closed", self.name)
+            self._update(lambda _: CircuitState(**CLOSED_STATE))
+
+    def record_failure(self) -> None:
+        """
+        Record a failed call, opening (or reopening) the circuit once past the threshold.
+        Only record failures of the upstream itself; see is_upstream_failure.
+        """
+        now = time.time()
+        opened_after: int | None = None
+
+        def add_failure(state: CircuitState) -> CircuitState:
+            nonlocal opened_after
+            state["failures"] += 1
+            state["negative_until"] = now + self.negative_cache_seconds
+            opened_after = None
+            if state["opened_at"] is not None or state["failures"] >= self.failure_threshold:
+                state["opened_at"] = now
+                state["probe_started_at"] = None
+                opened_after = state["failures"]
+            return state
+
+        self._update(add_failure)
+        if opened_after is not None:
+            logger.warning(
+                "🔌 Circuit %s open after %s consecutive failures", self.name, opened_after
+            )
+
+
+def is_upstream_failure(error: BaseException, timeout_shortened: bool = False) -> bool:
+    """
+    Whether an error means the upstream itself is failing, and so counts toward its
+    shared circuit breaker: connection errors, timeouts of the full configured length,
+    5xx responses and 429s. Client errors (such as one tenant's bad API key or
+    location), unparseable or incomplete responses, and timeouts cut short by an
+    invocation's deadline say nothing about the upstream and don't count.
+
+    Args:
+        error: The error the call raised
+        timeout_shortened: Whether the call's timeout was cut below its configured length
+    """
+    if isinstance(error, requests.exceptions.Timeout | TimeoutError):
+        return not timeout_shortened
+    if isinstance(error, requests.exceptions.ConnectionError):
+        return True
+    if isinstance(error, requests.exceptions.HTTPError) and error.response is not None:
+        status = error.response.status_code
+        return status >= HTTP_SERVER_ERROR or status == HTTP_TOO_MANY_REQUESTS
+    return False
+
+
+def get_circuit_breaker(name: str) -> CircuitBreaker:
+    """Get the circuit breaker for an upstream, backed by the configured state store."""
+    return CircuitBreaker(name, get_store())
@@ -16,6 +16,8 @@ class Config:
         self.weather_location = secrets["WEATHER_LOCATION"]
         self.weather_lat = secrets["WEATHER_LAT"]
         self.weather_lon = secrets["WEATHER_LON"]
+        self.tenant_id = secrets.get("TENANT_ID", "default")
+        self.timezone = secrets.get("TZ", "America/New_York")
 
         birthdays_str = secrets["BIRTHDAYS_CONFIG"]
         self.birthdays_config = parse_birthdays_config(birthdays_str)
@@ -24,6 +26,11 @@ class Config:
 
 
 def load_secrets(secret_arn: str) -> dict:
+    # A file:// "ARN" points at a local secrets file, e.g. one per tenant in daemon mode
+    if secret_arn.startswith("file://"):
+        with open(secret_arn.removeprefix("file://")) as f:
+            return json.load(f)
+
     # First try to load from local secrets.json for development
     if os.path.exists("secrets.json"):
         try:
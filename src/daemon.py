@@ -0,0 +1,199 @@
+"""
+Long-running scheduler daemon, a self-hosted alternative to the Lambda deployment.
+
+Fires each tenant's morning run at its local RUN_HOUR (from the tenant's TZ secret),
+reusing the same stages as lambda_handler. Configs, the Anthropic clients and the
+shared HTTP session stay warm across days, and because every tenant is scheduled in
+its own time zone there is no DST switch function to run.
+
+    SECRET_ARN=... python -m src.daemon
+    DAEMON_TENANTS=file://tenants/a.json,file://tenants/b.json python -m src.daemon --port 8080
+
+GET /health reports liveness and GET /metrics reports run latency per tenant, Anthropic
+rate limiter wait times and each weather provider's win rate and latency.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import statistics
+import sys
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any
+from zoneinfo import ZoneInfo
+
+from src.config import Config
+from src.deadline import Deadline
+from src.lambda_function import run_all_tasks
+from src.log_setup import configure_logging, flush_logs, start_invocation
+from src.rate_limit import get_rate_limiter
+from src.services.weather import get_weather_provider_stats
+
+logger = logging.getLogger(__name__)
+
+RUN_HOUR = 7
+RUN_BUDGET_SECONDS = 5 * 60
+# Sleep in bounded chunks so clock changes and host suspends don't delay a run
+MAX_SLEEP_SECONDS = 15 * 60
+LATENCY_WINDOW = 30  # Recent runs kept per tenant for latency percentiles
+DEFAULT_PORT = 8080
+
+
+@dataclass
+class TenantMetrics:
+    """Run history for one tenant."""
+
+    runs: int = 0
+    failures: int = 0
+    last_started_at: float | None = None
+    last_status: str | None = None
+    next_run_at: str | None = None
+    latencies: deque[float] = field(default_factory=lambda: deque(maxlen=LATENCY_WINDOW))
+
+    def summary(self) -> dict[str, Any]:
+        latencies = sorted(self.latencies)
+        return {
+            "runs": self.runs,
+            "failures": self.failures,
+            "last_started_at": self.last_started_at,
+            "last_status": self.last_status,
+            "next_run_at": self.next_run_at,
+            "last_latency_seconds": self.latencies[-1] if self.latencies else None,
+            "p50_latency_seconds": statistics.median(latencies) if latencies else None,
+            "p95_latency_seconds": (
+                statistics.quantiles(latencies, n=20)[-1] if len(latencies) > 1 else None
+            ),
+            "max_latency_seconds": latencies[-1] if latencies else None,
+        }
+
+
+def next_run_time(now: datetime, hour: int = RUN_HOUR) -> datetime:
+    """Next occurrence of the given local wall-clock hour, handling DST via zoneinfo."""
+    # zoneinfo resolves the UTC offset from the wall time, so adding a day across a DST
+    # change still lands on the local hour
+    candidate = now.replace(hour=hour, minute=0, second=0, microsecond=0)
+    if candidate <= now:
+        candidate += timedelta(days=1)
+    return candidate
+
+
+def run_tenant(config: Config, metrics: TenantMetrics) -> None:
+    """Run a tenant's morning tasks once, recording latency and outcome."""
+    start_invocation(tenant_id=config.tenant_id)
+    metrics.last_started_at = time.time()
+    start = time.perf_counter()
+    try:
+        run_all_tasks(config, Deadline.after(RUN_BUDGET_SECONDS))
+        metrics.last_status = "ok"
+        logger.info({"event": "all_tasks_completed", "tenant_id": config.tenant_id})
+    except Exception as e:
+        metrics.failures += 1
+        metrics.last_status = f"error: {e!s}"
+        logger.exception({"event": "daemon_run_failed", "tenant_id": config.tenant_id})
+    finally:
+        metrics.runs += 1
+        metrics.latencies.append(round(time.perf_counter() - start, 3))
+        flush_logs()
+
+
+async def schedule_tenant(config: Config, metrics: TenantMetrics) -> None:
+    """Run a tenant's morning tasks every day at its local RUN_HOUR."""
+    tz = ZoneInfo(config.timezone)
+    while True:
+        run_at = next_run_time(datetime.now(tz))
+        metrics.next_run_at = run_at.isoformat()
+        while (remaining := (run_at - datetime.now(tz)).total_seconds()) > 0:
+            await asyncio.sleep(min(remaining, MAX_SLEEP_SECONDS))
+        # The stages make blocking HTTP calls, so run them off the event loop
+        await asyncio.to_thread(run_tenant, config, metrics)
+
+
+async def handle_http(
+    reader: asyncio.StreamReader,
+    writer: asyncio.StreamWriter,
+    metrics: dict[str, TenantMetrics],
+) -> None:
+    """Serve GET /health and GET /metrics as JSON."""
+    try:
+        request_line = (await reader.readline()).decode(errors="replace").split()
+        # Drain the headers; the request body is never needed
+        while (await reader.readline()).strip():
+            pass
+
+        path = request_line[1] if len(request_line) > 1 else "/"
+        if path == "/health":
+            status, body = "200 OK", {"status": "ok", "tenants": len(metrics)}
+        elif path == "/metrics":
+            status = "200 OK"
+            body = {
+                "tenants": {
+                    tenant: tenant_metrics.summary() for tenant, tenant_metrics in metrics.items()
+                },
+                "anthropic_rate_limit": get_rate_limiter().snapshot(),
+                # Read from the state store, so off the event loop
+                "weather_providers": await asyncio.to_thread(get_weather_provider_stats),
+            }
+        else:
+            status, body = "404 Not Found", {"error": "not found"}
+
+        payload = json.dumps(body).encode()
+        writer.write(
+            f"HTTP/1.1 {status}\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(payload)}\r\nConnection: close\r\n\r\n".encode()
+            + payload
+        )
+        await writer.drain()
+    finally:
+        writer.close()
+
+
+def load_tenants() -> list[Config]:
+    """Load a Config per tenant from DAEMON_TENANTS (comma-separated), or SECRET_ARN."""
+    secret_arns = os.environ.get("DAEMON_TENANTS") or os.environ.get("SECRET_ARN")
+    if not secret_arns:
+        raise ValueError("Set DAEMON_TENANTS or SECRET_ARN to run the daemon")
+    configs = [Config(secret_arn=arn.strip()) for arn in secret_arns.split(",") if arn.strip()]
+    tenant_ids = [config.tenant_id for config in configs]
+    if len(set(tenant_ids)) != len(tenant_ids):
+        raise ValueError("Each tenant's secrets need a distinct TENANT_ID")
+    return configs
+
+
+async def serve(port: int, run_now: bool) -> None:
+    """Start the health endpoint and the per-tenant schedules."""
+    configs = load_tenants()
+    metrics = {config.tenant_id: TenantMetrics() for config in configs}
+
+    server = await asyncio.start_server(
+        lambda reader, writer: handle_http(reader, writer, metrics), port=port
+    )
+    logger.info({"event": "daemon_started", "port": port, "tenants": list(metrics)})
+    flush_logs()
+
+    if run_now:
+        for config in configs:
+            await asyncio.to_thread(run_tenant, config, metrics[config.tenant_id])
+
+    async with server:
+        await asyncio.gather(
+            *(schedule_tenant(config, metrics[config.tenant_id]) for config in configs)
+        )
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Run Felix and Pearl as a scheduler daemon")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="Health/metrics port")
+    parser.add_argument("--run-now", action="store_true", help="Run every tenant on startup")
+    args = parser.parse_args(argv)
+
+    configure_logging()
+    asyncio.run(serve(args.port, args.run_now))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,82 @@
+import time
+from typing import Any
+
+# Time kept back from the Lambda timeout so the handler can log and return cleanly
+DEFAULT_RESERVE_SECONDS = 2.0
+
+# Remaining budget below which optional work (e.g. thank-you messages) is skipped
+LOW_PRIORITY_BUDGET_SECONDS = 15.0
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when there is no time left in the invocation budget for another call."""
+
+
+class Deadline:
+    """
+    An end-to-end time budget for a single invocation.
+
+    Every external call asks the deadline for its timeout, so a call never waits longer
+    than the invocation has left, even when its own fixed timeout would allow it.
+    """
+
+    def __init__(self, expires_at: float | None):
+        """
+        Initialize a Deadline.
+
+        Args:
+            expires_at: time.monotonic() value at which the budget runs out,
+                or None for an unbounded budget
+        """
+        self.expires_at = expires_at
+
+    @classmethod
+    def from_context(
+        cls, context: Any, reserve_seconds: float = DEFAULT_RESERVE_SECONDS
+    ) -> "Deadline":
+        """
+        Build a deadline from a Lambda context object.
+        Falls back to an unbounded deadline when the context can't report remaining time
+        (e.g. when the handler is called directly from a script).
+        """
+        get_remaining = getattr(context, "get_remaining_time_in_millis", None)
+        if get_remaining is None:
+            return cls(None)
+        return cls.after(get_remaining() / 1000 - reserve_seconds)
+
+    @classmethod
+    def after(cls, seconds: float) -> "Deadline":
+        """Build a deadline that expires the given number of seconds from now."""
+        return cls(time.monotonic() + max(seconds, 0.0))
+
+    def remaining(self) -> float:
+        """Seconds left in the budget (infinite for an unbounded deadline)."""
+        if self.expires_at is None:
+            return float("inf")
+        return max(self.expires_at - time.monotonic(), 0.0)
+
+    def expired(self) -> bool:
+        """Whether the budget has run out."""
+        return self.remaining() <= 0
+
+    def has_budget(self, seconds: float) -> bool:
+        """Whether at least the given number of seconds are left."""
+        return self.remaining() >= seconds
+
+    def reserve(self, seconds: float) -> "Deadline":
+        """Build a deadline that expires earlier, keeping the given seconds back for later work."""
+        if self.expires_at is None:
+            return self
+        return Deadline(self.expires_at - seconds)
+
+    def timeout(self, own_timeout: float) -> float:
+        """
+        Timeout to use for a single call: min(own timeout, remaining budget).
+
+        Raises:
+            DeadlineExceeded: If the budget has already run out
+        """
+        remaining = self.remaining()
+        if remaining <= 0:
+            raise DeadlineExceeded("Invocation deadline exceeded")
+        return min(own_timeout, remaining)
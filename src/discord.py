@@ -4,26 +4,30 @@ from typing import TypedDict
 import requests
 
 from src.config import Config
+from src.deadline import Deadline
+from src.http import get_session
 from src.prompts import FELIX, PEARL
 
 logger = logging.getLogger(__name__)
 
+DISCORD_TIMEOUT_SECONDS = 10
+
 
 class WebhookResponse(TypedDict):
     content: str
 
 
-def send_felix_message(config: Config, content: str) -> bool:
+def send_felix_message(config: Config, content: str, deadline: Deadline) -> bool:
     """Send a message as Felix."""
-    return send_message(content, FELIX["name"], config.felix_webhook_url)
+    return send_message(content, FELIX["name"], config.felix_webhook_url, deadline)
 
 
-def send_pearl_message(config: Config, content: str) -> bool:
+def send_pearl_message(config: Config, content: str, deadline: Deadline) -> bool:
     """Send a message as Pearl."""
-    return send_message(content, PEARL["name"], config.pearl_webhook_url)
+    return send_message(content, PEARL["name"], config.pearl_webhook_url, deadline)
 
 
-def send_message(content: str, character_name: str, webhook_url: str) -> bool:
+def send_message(content: str, character_name: str, webhook_url: str, deadline: Deadline) -> bool:
     """
     Send a message to Discord using the provided webhook URL.
     Returns True if successful, False otherwise.
@@ -32,17 +36,22 @@ def send_message(content: str, character_name: str, webhook_url: str) -> bool:
         content: The message content to send
         webhook_url: The Discord webhook URL to use
         character_name: The name of the character sending the message (for logging)
+        deadline: Invocation deadline bounding the request timeout
     """
     try:
-        response = requests.post(webhook_url, json=WebhookResponse(content=content), timeout=10)
+        response = get_session().post(
+            webhook_url,
+            json=WebhookResponse(content=content),
+            timeout=deadline.timeout(DISCORD_TIMEOUT_SECONDS),
+        )
         response.raise_for_status()
 
-        logger.info(f"💬 {character_name}'s message sent successfully")
+        logger.info("💬 %s's message sent successfully", character_name)
         return True
 
     except requests.exceptions.RequestException as e:
-        logger.error(f"❌ Failed to send {character_name}'s message: {e!s}")
+        logger.error("❌ Failed to send %s's message: %s", character_name, e)
         return False
     except Exception as e:
-        logger.error(f"❌ Error sending {character_name}'s message: {e!s}")
+        logger.error("❌ Error sending %s's message: %s", character_name, e)
         return False
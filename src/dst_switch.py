@@ -1,18 +1,118 @@
 import json
 import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Any
+from functools import cache
+from typing import Any, Literal, Protocol, TypedDict
 from zoneinfo import ZoneInfo
 
 import boto3
 import boto3.exceptions
+from botocore.exceptions import BotoCoreError, ClientError
+
+from src.log_setup import flush_logs, start_invocation, submit_in_context
+from src.profiling import profiled
 
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.DEBUG)
 
 MARCH = 3
 NOVEMBER = 11
 
+RULE_NAME_PREFIX = "DailySchedule"
+EDT_RULE = "DailyScheduleEDT"
+EST_RULE = "DailyScheduleEST"
+EDT_SCHEDULE = "cron(0 11 * * ? *)"  # 7 AM EDT
+EST_SCHEDULE = "cron(0 12 * * ? *)"  # 7 AM EST
+
+RuleState = Literal["ENABLED", "DISABLED"]
+
+
+class ScheduleRule(TypedDict):
+    name: str
+    schedule_expression: str
+    state: RuleState
+
+
+class RuleChange(TypedDict):
+    rule: ScheduleRule
+    drifted_fields: list[str]
+
+
+class ReconcileResult(TypedDict):
+    checked: int
+    in_sync: int
+    changes: list[RuleChange]
+    # Desired rules that don't exist; never created, since they'd have no targets
+    missing: list[str]
+    unmanaged: list[str]  # Rules under the prefix that aren't in the desired state
+    applied: list[str]
+    failed: list[str]
+
+
+class MissingScheduleRuleError(LookupError):
+    """Raised when a schedule rule the template should have deployed doesn't exist."""
+
+
+class EventsClient(Protocol):
+    """The subset of the EventBridge client the reconciler uses."""
+
+    def list_rules(self, **kwargs: Any) -> dict[str, Any]: ...
+
+    def put_rule(self, **kwargs: Any) -> dict[str, Any]: ...
+
+
+class StubEventsClient:
+    """
+    An in-memory stand-in for the EventBridge API, for local runs and tests.
+    Records every put_rule call and can add latency to each call.
+    """
+
+    def __init__(
+        self,
+        rules: list[ScheduleRule] | None = None,
+        latency_seconds: float = 0.0,
+        page_size: int = 100,
+    ):
+        self.rules = {rule["name"]: rule for rule in rules or []}
+        self.latency_seconds = latency_seconds
+        self.page_size = page_size
+        self.put_calls: list[ScheduleRule] = []
+        self.lock = threading.Lock()
+
+    def list_rules(self, **kwargs: Any) -> dict[str, Any]:
+        time.sleep(self.latency_seconds)
+        names = sorted(name for name in self.rules if name.startswith(kwargs.get("NamePrefix", "")))
+        start = int(kwargs.get("NextToken", 0))
+        page = names[start : start + self.page_size]
+        response: dict[str, Any] = {
+            "Rules": [
+                {
+                    "Name": name,
+                    "Arn": f"arn:aws:events:us-east-1:000000000000:rule/{name}",
+                    "ScheduleExpression": self.rules[name]["schedule_expression"],
+                    "State": self.rules[name]["state"],
+                }
+                for name in page
+            ]
+        }
+        if start + self.page_size < len(names):
+            response["NextToken"] = str(start + self.page_size)
+        return response
+
+    def put_rule(self, **kwargs: Any) -> dict[str, Any]:
+        time.sleep(self.latency_seconds)
+        rule = ScheduleRule(
+            name=kwargs["Name"],
+            schedule_expression=kwargs["ScheduleExpression"],
+            state=kwargs["State"],
+        )
+        with self.lock:
+            self.rules[rule["name"]] = rule
+            self.put_calls.append(rule)
+        return {"RuleArn": f"arn:aws:events:us-east-1:000000000000:rule/{rule['name']}"}
+
 
 def get_current_time() -> datetime:
     """Get current time in America/New_York timezone."""
@@ -45,85 +145,213 @@ def is_dst_change_day() -> bool:
     return False
 
 
-def update_lambda_schedule(is_dst: bool) -> None:
+@cache
+def get_events_client() -> EventsClient:
+    """Get the EventBridge client, reused across warm invocations."""
+    return boto3.client("events")
+
+
+def desired_rules(is_dst: bool) -> list[ScheduleRule]:
+    """The schedule rules for DST or standard time: 7 AM Eastern either way."""
+    return [
+        ScheduleRule(
+            name=EDT_RULE,
+            schedule_expression=EDT_SCHEDULE,
+            state="ENABLED" if is_dst else "DISABLED",
+        ),
+        ScheduleRule(
+            name=EST_RULE,
+            schedule_expression=EST_SCHEDULE,
+            state="DISABLED" if is_dst else "ENABLED",
+        ),
+    ]
+
+
+def list_schedule_rules(events_client: EventsClient) -> dict[str, ScheduleRule]:
+    """Read the current state of every rule under RULE_NAME_PREFIX, by name."""
+    rules: dict[str, ScheduleRule] = {}
+    kwargs: dict[str, Any] = {"NamePrefix": RULE_NAME_PREFIX}
+    while True:
+        response = events_client.list_rules(**kwargs)
+        for rule in response["Rules"]:
+            rules[rule["Name"]] = ScheduleRule(
+                name=rule["Name"],
+                schedule_expression=rule.get("ScheduleExpression", ""),
+                state=rule["State"],
+            )
+        if not (next_token := response.get("NextToken")):
+            return rules
+        kwargs["NextToken"] = next_token
+
+
+def diff_rules(
+    current: dict[str, ScheduleRule], desired: list[ScheduleRule]
+) -> tuple[list[RuleChange], list[str]]:
     """
-    Update the Lambda function's schedule based on DST status.
+    The changes needed to bring the current rules to the desired state.
+
+    Returns:
+        Tuple containing:
+        - Changes to the existing rules that have drifted
+        - Names of desired rules that don't exist
+    """
+    changes = []
+    missing = []
+    for rule in desired:
+        actual = current.get(rule["name"])
+        if actual is None:
+            missing.append(rule["name"])
+            continue
+        drifted_fields = [
+            field
+            for field in ("schedule_expression", "state")
+            if actual[field] != rule[field]  # type: ignore[literal-required]
+        ]
+        if drifted_fields:
+            changes.append(RuleChange(rule=rule, drifted_fields=drifted_fields))
+    return changes, missing
+
+
+def put_rule(events_client: EventsClient, rule: ScheduleRule) -> None:
+    events_client.put_rule(
+        Name=rule["name"],
+        ScheduleExpression=rule["schedule_expression"],
+        State=rule["state"],
+    )
+
+
+def update_lambda_schedule(
+    is_dst: bool, events_client: EventsClient | None = None
+) -> ReconcileResult:
+    """
+    Reconcile the Lambda function's schedule rules with the DST status: read every rule
+    in one pass, then concurrently update only those that differ from the desired state.
 
     Args:
         is_dst: Whether we're in Daylight Saving Time
+        events_client: EventBridge client to use, e.g. a StubEventsClient; defaults to
+            the shared client
+
+    Returns:
+        What was checked, which rules had drifted and which updates were applied
 
     Raises:
-        boto3.exceptions.Boto3Error: If the schedule update fails
+        botocore.exceptions.ClientError: If reading the rules or any update fails, after
+            the other updates have been applied
+        MissingScheduleRuleError: If a desired rule doesn't exist. Only the template can
+            create the rules with their targets, so they're reported, not created
     """
+    events_client = events_client or get_events_client()
+    desired = desired_rules(is_dst)
     try:
-        events_client = boto3.client("events")
-
-        # Update the schedule rules
-        if is_dst:
-            # EDT schedule (7 AM EDT)
-            events_client.put_rule(
-                Name="DailyScheduleEDT",
-                ScheduleExpression="cron(0 11 * * ? *)",
-                State="ENABLED",
-            )
-            events_client.put_rule(
-                Name="DailyScheduleEST",
-                ScheduleExpression="cron(0 12 * * ? *)",
-                State="DISABLED",
-            )
-        else:
-            # EST schedule (7 AM EST)
-            events_client.put_rule(
-                Name="DailyScheduleEDT",
-                ScheduleExpression="cron(0 11 * * ? *)",
-                State="DISABLED",
-            )
-            events_client.put_rule(
-                Name="DailyScheduleEST",
-                ScheduleExpression="cron(0 12 * * ? *)",
-                State="ENABLED",
-            )
-    except boto3.exceptions.Boto3Error as e:
-        logger.error(f"Failed to update Lambda schedule: {e!s}")
+        start = time.perf_counter()
+        current = list_schedule_rules(events_client)
+        list_ms = (time.perf_counter() - start) * 1000
+    except (boto3.exceptions.Boto3Error, BotoCoreError, ClientError) as e:
+        logger.error("Failed to read schedule rules: %s", e)
         raise e
+    changes, missing = diff_rules(current, desired)
+    for name in missing:
+        logger.error("Schedule rule %s is missing; redeploy the template to create it", name)
 
+    # boto3 clients are thread-safe, so the updates share the one client
+    start = time.perf_counter()
+    errors: dict[str, BaseException] = {}
+    if changes:
+        with ThreadPoolExecutor(max_workers=len(changes)) as executor:
+            futures = {
+                change["rule"]["name"]: submit_in_context(
+                    executor, put_rule, events_client, change["rule"]
+                )
+                for change in changes
+            }
+        for name, future in futures.items():
+            if error := future.exception():
+                logger.error("Failed to update rule %s: %s", name, error)
+                errors[name] = error
+    apply_ms = (time.perf_counter() - start) * 1000
+    applied = [change["rule"]["name"] for change in changes if change["rule"]["name"] not in errors]
+    failed = list(errors)
 
+    desired_names = {rule["name"] for rule in desired}
+    result = ReconcileResult(
+        checked=len(current),
+        in_sync=len(desired) - len(changes) - len(missing),
+        changes=changes,
+        missing=missing,
+        unmanaged=sorted(name for name in current if name not in desired_names),
+        applied=applied,
+        failed=failed,
+    )
+    logger.info(
+        {
+            "event": "schedule_drift",
+            "schedule": "EDT" if is_dst else "EST",
+            "rules_checked": result["checked"],
+            "rules_in_sync": result["in_sync"],
+            "rules_missing": len(missing),
+            "rules_drifted": len(changes),
+            "missing": missing,
+            "drifted_fields": {
+                change["rule"]["name"]: change["drifted_fields"] for change in changes
+            },
+            "unmanaged": result["unmanaged"],
+            "applied": applied,
+            "failed": failed,
+            "list_ms": round(list_ms, 1),
+            "apply_ms": round(apply_ms, 1),
+        }
+    )
+    if errors:
+        raise next(iter(errors.values()))
+    if missing:
+        raise MissingScheduleRuleError(f"Schedule rules not found: {', '.join(missing)}")
+    return result
+
+
+@profiled
 def lambda_handler(event: dict[str, Any], context: Any) -> dict[str, Any]:
     """
     Lambda handler for DST switch service.
 
     Args:
-        event: Lambda event data
+        event: Lambda event data; set "profile" to profile the invocation (see src.profiling)
         context: Lambda context object
 
     Returns:
         Dictionary containing status code and response body
     """
+    start_invocation(request_id=getattr(context, "aws_request_id", None))
     try:
         logger.info("Checking for DST change")
+        # Get current time to determine if we're in DST
+        now = get_current_time()
+        is_dst = now.dst() != timedelta(0)
+        schedule = "EDT" if is_dst else "EST"
         # Check if today is a DST change day
-        if is_dst_change_day():
-            # Get current time to determine if we're in DST
-            now = get_current_time()
-            is_dst = now.dst() != timedelta(0)
-            logger.info(f"DST change detected, switching to {'EDT' if is_dst else 'EST'}")
-
-            # Update the schedule
-            update_lambda_schedule(is_dst)
-
-            return {
-                "statusCode": 200,
-                "body": json.dumps(
-                    {"message": f"Successfully updated schedule for {'EDT' if is_dst else 'EST'}"}
-                ),
-            }
+        change_day = is_dst_change_day()
+        if change_day:
+            logger.info("DST change detected, switching to %s", schedule)
+        else:
+            logger.info("Not a DST change day")
+
+        # Reconcile every day: with the rules in sync this is a single read, and any
+        # drift is corrected instead of waiting for the next change day
+        result = update_lambda_schedule(is_dst)
 
-        logger.info("Not a DST change day")
+        if result["applied"]:
+            message = f"Updated {', '.join(result['applied'])} for {schedule}"
+        elif change_day:
+            message = f"Schedule was already set for {schedule}"
+        else:
+            message = "Not a DST change day"
         return {
             "statusCode": 200,
-            "body": json.dumps({"message": "Not a DST change day"}),
+            "body": json.dumps({"message": message, "updated_rules": result["applied"]}),
         }
 
     except Exception as e:
-        logger.error(f"Error in DST handler: {e!s}")
+        logger.error("Error in DST handler: %s", e)
         return {"statusCode": 500, "body": json.dumps({"error": str(e)})}
+    finally:
+        flush_logs()
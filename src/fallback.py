@@ -0,0 +1,75 @@
+import random
+
+from src.prompts import (
+    FALLBACK_NATIONAL_DAYS_TEMPLATE,
+    FALLBACK_WEATHER_TEMPLATE,
+    FELIX,
+    PEARL,
+    CharacterInfo,
+)
+from src.services.national_days import NationalDay
+from src.services.weather import PRECIPITATION_CHANCE_THRESHOLD, DailyForecast, WeatherData
+
+
+def get_persona_rng(character: CharacterInfo, run_date: str) -> random.Random:
+    """
+    Get a random generator seeded by character and the tenant's run date, so a retried
+    or replayed run renders the same message while consecutive days still vary.
+    """
+    return random.Random(f"{character['name']}-{run_date}")
+
+
+def format_forecast_lines(upcoming: list[DailyForecast]) -> str:
+    """Format the upcoming days for a reader, e.g. "- Monday: high 61°F, low 48°F, light rain"."""
+    lines = []
+    for day in upcoming:
+        line = f"- {day['date']:%A}: high {day['high']}°F, low {day['low']}°F, {day['description']}"
+        if day["pop"] > PRECIPITATION_CHANCE_THRESHOLD:
+            line += f" ({day['pop']:.0%} chance of precipitation)"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def render_national_days_message(national_days: list[NationalDay], run_date: str) -> str:
+    """Render Felix's national days message locally, without calling Claude."""
+    rng = get_persona_rng(FELIX, run_date)
+    days_text = "\n".join(f"{rng.choice(FELIX['emojis'])} {day.name}" for day in national_days)
+    return FALLBACK_NATIONAL_DAYS_TEMPLATE.format(
+        emoji=rng.choice(FELIX["emojis"]),
+        full_name=FELIX["full_name"],
+        days_text=days_text,
+        pun=rng.choice(FELIX["puns"]),
+        closing_emoji=rng.choice(FELIX["emojis"]),
+    )
+
+
+def render_weather_message(location: str, weather_data: WeatherData, run_date: str) -> str:
+    """Render Pearl's weather message locally, without calling Claude."""
+    rng = get_persona_rng(PEARL, run_date)
+    current = weather_data["current"]
+    today = weather_data["today"]
+    feels_like = (
+        f" (feels like {current['feels_like']}°F)" if current["feels_like"] is not None else ""
+    )
+    precipitation = (
+        f", {today['pop']:.0%} chance of precipitation"
+        if today["pop"] > PRECIPITATION_CHANCE_THRESHOLD
+        else ""
+    )
+    return FALLBACK_WEATHER_TEMPLATE.format(
+        emoji=rng.choice(PEARL["emojis"]),
+        full_name=PEARL["full_name"],
+        location=location,
+        current_temp=current["temp"],
+        feels_like=feels_like,
+        current_description=current["description"],
+        high=today["high"],
+        low=today["low"],
+        today_description=today["description"],
+        precipitation=precipitation,
+        sunrise=weather_data["sunrise"],
+        sunset=weather_data["sunset"],
+        upcoming_forecast=format_forecast_lines(weather_data["upcoming"]),
+        pun=rng.choice(PEARL["puns"]),
+        closing_emoji=rng.choice(PEARL["emojis"]),
+    )
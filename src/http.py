@@ -0,0 +1,21 @@
+from functools import cache
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Enough pooled connections per host for the concurrent detail page fetches
+POOL_MAXSIZE = 16
+
+
+@cache
+def get_session() -> requests.Session:
+    """
+    Get the shared HTTP session.
+    Reusing it keeps connections (and their TLS handshakes) warm across calls,
+    within a warm Lambda container or for the lifetime of the daemon.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=POOL_MAXSIZE, pool_maxsize=POOL_MAXSIZE)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
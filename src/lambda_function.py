@@ -1,86 +1,252 @@
 import json
 import logging
 import os
+from collections.abc import Callable
+from datetime import date, datetime
 from typing import Any
+from zoneinfo import ZoneInfo
 
 import requests
 
 from src.ai import generate_national_days_message, generate_weather_message
+from src.archive import get_archive
 from src.config import Config
+from src.deadline import LOW_PRIORITY_BUDGET_SECONDS, Deadline, DeadlineExceeded
 from src.discord import send_felix_message, send_pearl_message
+from src.fallback import render_national_days_message, render_weather_message
+from src.ledger import RunLedger
+from src.log_setup import flush_logs, start_invocation
+from src.memory import MemoryProfiler
+from src.profiling import profiled
+from src.prompts import FELIX, PEARL, CharacterInfo
+from src.rate_limit import get_rate_limiter
 from src.services.birthdays import (
+    BirthdayInfo,
     check_birthdays,
     generate_felix_birthday_message,
     generate_felix_thank_you_message,
     generate_pearl_birthday_message,
     generate_pearl_thank_you_message,
 )
-from src.services.national_days import get_national_days
-from src.services.weather import get_weather
+from src.services.national_days import enrich_national_days, get_national_days
+from src.services.weather import get_weather, get_weather_provider_stats
+from src.snapshots import (
+    SnapshotError,
+    decode_national_days,
+    decode_weather,
+    encode_national_days,
+    encode_weather,
+)
+from src.store import get_store
 
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.DEBUG)
 
 
-def process_birthdays(config: Config, test_date: str | None = None) -> None:
+NATIONAL_DAYS_MESSAGE_ID = "national_days"
+WEATHER_MESSAGE_ID = "weather"
+
+
+def has_low_priority_budget(deadline: Deadline, task: str) -> bool:
+    """Check whether there's enough budget left for optional work, logging if it's skipped."""
+    if deadline.has_budget(LOW_PRIORITY_BUDGET_SECONDS):
+        return True
+    logger.warning(
+        {"event": "low_priority_skipped", "task": task, "remaining": deadline.remaining()}
+    )
+    return False
+
+
+def load_stage_output[T](ledger: RunLedger, stage: str, decode: Callable[[str], T]) -> T | None:
+    """Reload a stage's output recorded by a previous attempt, or None to run the stage."""
+    payload = ledger.stage_output(stage)
+    if payload is None:
+        return None
+    try:
+        output = decode(payload)
+    except SnapshotError as e:
+        logger.warning({"event": "stage_output_invalid", "stage": stage, "error": str(e)})
+        return None
+    logger.info({"event": "stage_output_reused", "stage": stage})
+    return output
+
+
+def deliver_message(
+    ledger: RunLedger,
+    message_id: str,
+    character: CharacterInfo,
+    generate: Callable[[], str | None],
+    send: Callable[[str], bool],
+) -> None:
+    """
+    Generate and send a message at most once per run, archiving it once it's sent.
+    Reuses a message generated by a previous attempt and skips messages already sent.
+    """
+    if ledger.is_sent(message_id):
+        logger.info({"event": "message_already_sent", "message_id": message_id})
+        return
+
+    if message := ledger.generated_message(message_id):
+        logger.info({"event": "message_resumed", "message_id": message_id})
+    elif message := generate():
+        logger.info({"event": "message_generated", "message_id": message_id, "message": message})
+        ledger.mark_generated(message_id, message)
+    else:
+        return
+
+    if send(message):
+        ledger.mark_sent(message_id, message)
+        get_archive().append(
+            ledger.tenant_id, character["name"], ledger.run_date, message_id, message
+        )
+
+
+def process_birthdays(
+    config: Config, deadline: Deadline, ledger: RunLedger, test_date: str | None = None
+) -> None:
     """Process and send birthday messages."""
-    birthdays = check_birthdays(config, test_date)
+    birthdays = check_birthdays(config, test_date, date.fromisoformat(ledger.run_date))
     if not birthdays:
         return
 
     logger.info({"event": "birthday_check", "count": len(birthdays)})
 
     for birthday in birthdays:
-        logger.info({"event": "processing_birthday", "name": birthday["name"]})
+        process_birthday(config, deadline, ledger, birthday)
 
-        # Process Felix messages
-        if felix_message := generate_felix_birthday_message(config, birthday):
-            logger.info({"event": "felix_message_generated", "message": felix_message})
-            send_felix_message(config, felix_message)
 
-        if felix_thank_you := generate_felix_thank_you_message(config, birthday):
-            logger.info({"event": "felix_thank_you_generated", "message": felix_thank_you})
-            send_felix_message(config, felix_thank_you)
+def process_birthday(
+    config: Config, deadline: Deadline, ledger: RunLedger, birthday: BirthdayInfo
+) -> None:
+    """Process and send the birthday messages for a single birthday."""
+    logger.info({"event": "processing_birthday", "name": birthday["name"]})
+    message_id = f"birthday:{birthday['name']}"
 
-        # Process Pearl messages
-        if pearl_message := generate_pearl_birthday_message(config, birthday):
-            logger.info({"event": "pearl_message_generated", "message": pearl_message})
-            send_pearl_message(config, pearl_message)
+    # Process Felix messages
+    deliver_message(
+        ledger,
+        f"{message_id}:felix",
+        FELIX,
+        lambda: generate_felix_birthday_message(config, birthday, deadline),
+        lambda message: send_felix_message(config, message, deadline),
+    )
 
-        if pearl_thank_you := generate_pearl_thank_you_message(config, birthday):
-            logger.info({"event": "pearl_thank_you_generated", "message": pearl_thank_you})
-            send_pearl_message(config, pearl_thank_you)
+    if has_low_priority_budget(deadline, "felix_thank_you"):
+        deliver_message(
+            ledger,
+            f"{message_id}:felix_thank_you",
+            FELIX,
+            lambda: generate_felix_thank_you_message(config, birthday, deadline),
+            lambda message: send_felix_message(config, message, deadline),
+        )
 
+    # Process Pearl messages
+    deliver_message(
+        ledger,
+        f"{message_id}:pearl",
+        PEARL,
+        lambda: generate_pearl_birthday_message(config, birthday, deadline),
+        lambda message: send_pearl_message(config, message, deadline),
+    )
 
-def process_national_days(config: Config) -> None:
-    """Process and send national days messages."""
-    national_days, error = get_national_days()
+    if has_low_priority_budget(deadline, "pearl_thank_you"):
+        deliver_message(
+            ledger,
+            f"{message_id}:pearl_thank_you",
+            PEARL,
+            lambda: generate_pearl_thank_you_message(config, birthday, deadline),
+            lambda message: send_pearl_message(config, message, deadline),
+        )
 
-    if error:
-        logger.error({"event": "national_days_error", "error": error})
-        return
 
-    if not national_days:
+def process_national_days(config: Config, deadline: Deadline, ledger: RunLedger) -> None:
+    """Process and send national days messages."""
+    if ledger.is_sent(NATIONAL_DAYS_MESSAGE_ID):
+        logger.info({"event": "message_already_sent", "message_id": NATIONAL_DAYS_MESSAGE_ID})
         return
 
-    logger.info({"event": "national_days_found", "count": len(national_days)})
+    national_days = load_stage_output(ledger, NATIONAL_DAYS_MESSAGE_ID, decode_national_days)
+    if national_days is None:
+        national_days, error = get_national_days(deadline, date.fromisoformat(ledger.run_date))
+
+        if error:
+            logger.error({"event": "national_days_error", "error": error})
+            return
+
+        if not national_days:
+            return
+
+        logger.info({"event": "national_days_found", "count": len(national_days)})
+        enrich_national_days(national_days, deadline)
+        ledger.record_stage_output(NATIONAL_DAYS_MESSAGE_ID, encode_national_days(national_days))
+
+    def generate() -> str:
+        if message := generate_national_days_message(config, national_days, deadline):
+            return message
+        logger.warning({"event": "national_days_message_fallback"})
+        return render_national_days_message(national_days, ledger.run_date)
 
-    if message := generate_national_days_message(config, national_days):
-        logger.info({"event": "national_days_message_generated", "message": message})
-        send_felix_message(config, message)
+    deliver_message(
+        ledger,
+        NATIONAL_DAYS_MESSAGE_ID,
+        FELIX,
+        generate,
+        lambda message: send_felix_message(config, message, deadline),
+    )
 
 
-def process_weather(config: Config) -> None:
+def process_weather(config: Config, deadline: Deadline, ledger: RunLedger) -> None:
     """Process and send weather messages."""
-    weather_data = get_weather(config)
-    if not weather_data:
+    if ledger.is_sent(WEATHER_MESSAGE_ID):
+        logger.info({"event": "message_already_sent", "message_id": WEATHER_MESSAGE_ID})
         return
 
-    logger.info({"event": "weather_data_retrieved", "location": config.weather_location})
+    weather_data = load_stage_output(ledger, WEATHER_MESSAGE_ID, decode_weather)
+    if weather_data is None:
+        weather_data = get_weather(config, deadline)
+        if not weather_data:
+            return
 
-    if message := generate_weather_message(config, weather_data):
-        logger.info({"event": "weather_message_generated", "message": message})
-        send_pearl_message(config, message)
+        logger.info({"event": "weather_data_retrieved", "location": config.weather_location})
+        ledger.record_stage_output(WEATHER_MESSAGE_ID, encode_weather(weather_data))
+
+    def generate() -> str:
+        if message := generate_weather_message(config, weather_data, deadline):
+            return message
+        logger.warning({"event": "weather_message_fallback"})
+        return render_weather_message(config.weather_location, weather_data, ledger.run_date)
+
+    deliver_message(
+        ledger,
+        WEATHER_MESSAGE_ID,
+        PEARL,
+        generate,
+        lambda message: send_pearl_message(config, message, deadline),
+    )
+
+
+def run_all_tasks(
+    config: Config,
+    deadline: Deadline,
+    test_date: str | None = None,
+    force: bool = False,
+    memory_profiler: MemoryProfiler | None = None,
+) -> None:
+    """Run the birthday, national days and weather stages of a tenant's morning run."""
+    memory_profiler = memory_profiler or MemoryProfiler(enabled=False)
+
+    # Record progress so a retried invocation resumes instead of starting over
+    run_date = datetime.now(ZoneInfo(config.timezone)).date().isoformat()
+    ledger = RunLedger(get_store(), config.tenant_id, run_date, force=force)
+
+    with memory_profiler.stage("birthdays"):
+        process_birthdays(config, deadline, ledger, test_date)
+    with memory_profiler.stage("national_days"):
+        process_national_days(config, deadline, ledger)
+    with memory_profiler.stage("weather"):
+        process_weather(config, deadline, ledger)
+
+    logger.info({"event": "anthropic_rate_limit", **get_rate_limiter().snapshot()})
+    logger.info({"event": "weather_provider_stats", "providers": get_weather_provider_stats()})
 
 
 def handle_error(error: Exception) -> tuple[int, str]:
@@ -93,6 +259,10 @@ def handle_error(error: Exception) -> tuple[int, str]:
         error_msg = f"Invalid data format: {error!s}"
         logger.error({"event": "value_error", "error": error_msg})
         return 400, error_msg
+    elif isinstance(error, DeadlineExceeded):
+        error_msg = f"Invocation deadline exceeded: {error!s}"
+        logger.error({"event": "deadline_exceeded", "error": error_msg})
+        return 504, error_msg
     elif isinstance(error, requests.exceptions.RequestException):
         error_msg = f"External API request failed: {error!s}"
         logger.error({"event": "request_error", "error": error_msg, "type": type(error).__name__})
@@ -105,26 +275,35 @@ def handle_error(error: Exception) -> tuple[int, str]:
         return 500, error_msg
 
 
+@profiled
 def lambda_handler(event: dict[str, Any], context: Any) -> dict[str, Any]:
     """
     Main Lambda handler function.
     Orchestrates the birthday checks, national days, and weather updates.
+    Set "profile" in the event to profile the invocation (see src.profiling).
     """
+    start_invocation(request_id=getattr(context, "aws_request_id", None))
+    memory_profiler = MemoryProfiler.from_event(event)
     try:
+        deadline = Deadline.from_context(context)
         secret_arn = os.environ.get("SECRET_ARN")
         if not secret_arn:
             raise ValueError("SECRET_ARN environment variable is not set")
 
-        config = Config(secret_arn=secret_arn)
+        with memory_profiler.stage("config"):
+            config = Config(secret_arn=secret_arn)
         test_date = event.get("test_date")
 
         if test_date:
             logger.info({"event": "test_date_set", "test_date": test_date})
 
-        # Process all tasks
-        process_birthdays(config, test_date)
-        process_national_days(config)
-        process_weather(config)
+        run_all_tasks(
+            config,
+            deadline,
+            test_date,
+            force=event.get("force", False),
+            memory_profiler=memory_profiler,
+        )
 
         logger.info({"event": "all_tasks_completed"})
         return {
@@ -138,3 +317,6 @@ def lambda_handler(event: dict[str, Any], context: Any) -> dict[str, Any]:
             "statusCode": status_code,
             "body": json.dumps({"error": error_msg}),
         }
+    finally:
+        memory_profiler.finish(context)
+        flush_logs()
@@ -0,0 +1,103 @@
+import logging
+from typing import Literal, TypedDict
+
+from src.store import StateStore
+
+logger = logging.getLogger(__name__)
+
+# Ledger entries only matter for retries of the same day's run
+LEDGER_TTL_SECONDS = 7 * 24 * 60 * 60
+
+MessageState = Literal["generated", "sent"]
+
+
+class LedgerEntry(TypedDict):
+    state: MessageState
+    message: str
+
+
+class RunLedger:
+    """
+    Records which messages of a day's run have been generated and sent, and the outputs
+    of the stages that fed them.
+
+    Entries are keyed by tenant, run date and message ID (or stage), so a retried or
+    re-invoked run reuses already fetched data and generated messages and skips messages
+    that were already posted. Store failures are logged and treated as missing entries,
+    so a broken store never stops the morning post.
+    """
+
+    def __init__(self, store: StateStore, tenant_id: str, run_date: str, force: bool = False):
+        """
+        Initialize a RunLedger.
+
+        Args:
+            store: State store holding the ledger entries
+            tenant_id: ID of the tenant the run is for
+            run_date: Date of the run, e.g. "2025-07-16"
+            force: Ignore existing entries and redo every message (still recording progress)
+        """
+        self.store = store
+        self.tenant_id = tenant_id
+        self.run_date = run_date
+        self.force = force
+
+    def _key(self, message_id: str) -> str:
+        return f"ledger:{self.tenant_id}:{self.run_date}:{message_id}"
+
+    def get_entry(self, message_id: str) -> LedgerEntry | None:
+        """Get the ledger entry for a message, or None if it hasn't been recorded."""
+        if self.force:
+            return None
+        try:
+            entry = self.store.get(self._key(message_id))
+        except Exception as e:
+            logger.error("❌ Failed to read ledger entry %s: %s", message_id, e)
+            return None
+        return LedgerEntry(state=entry["state"], message=entry["message"]) if entry else None
+
+    def is_sent(self, message_id: str) -> bool:
+        """Whether the message has already been sent in this run."""
+        entry = self.get_entry(message_id)
+        return entry is not None and entry["state"] == "sent"
+
+    def generated_message(self, message_id: str) -> str | None:
+        """Get the message generated by a previous attempt, if any."""
+        entry = self.get_entry(message_id)
+        return entry["message"] if entry else None
+
+    def mark_generated(self, message_id: str, message: str) -> None:
+        """Record that a message has been generated but not yet sent."""
+        self._put(message_id, LedgerEntry(state="generated", message=message))
+
+    def mark_sent(self, message_id: str, message: str) -> None:
+        """Record that a message has been sent."""
+        self._put(message_id, LedgerEntry(state="sent", message=message))
+
+    def stage_output(self, stage: str) -> str | None:
+        """Get the encoded output a previous attempt recorded for a stage, if any."""
+        if self.force:
+            return None
+        try:
+            entry = self.store.get(f"stage:{self.tenant_id}:{self.run_date}:{stage}")
+        except Exception as e:
+            logger.error("❌ Failed to read stage output %s: %s", stage, e)
+            return None
+        return entry["payload"] if entry else None
+
+    def record_stage_output(self, stage: str, payload: str) -> None:
+        """Record a stage's encoded output (see src.snapshots) for retries of the run."""
+        try:
+            self.store.put(
+                f"stage:{self.tenant_id}:{self.run_date}:{stage}",
+                {"payload": payload},
+                ttl_seconds=LEDGER_TTL_SECONDS,
+            )
+        except Exception as e:
+            logger.error("❌ Failed to record stage output %s: %s", stage, e)
+
+    def _put(self, message_id: str, entry: LedgerEntry) -> None:
+        try:
+            self.store.put(self._key(message_id), dict(entry), ttl_seconds=LEDGER_TTL_SECONDS)
+        except Exception as e:
+            logger.error("❌ Failed to record ledger entry %s: %s", message_id, e)
@@ -0,0 +1,617 @@
+"""
+Synthetic load generator.
+
+Synthesizes secrets for many tenants (each with its own birthdays and one of a pool of
+locations) and runs lambda_handler for every tenant from a pool of worker processes.
+Anthropic, OpenWeatherMap, the national days site and the Discord webhooks are served
+by a local fake with lognormal latencies, so a run exercises every stage without
+leaving the machine:
+
+    python -m src.loadgen --tenants 5000 --birthdays 20 --locations 300 --concurrency 1,8,32
+    python -m src.loadgen --tenants 50 --birthdays 100000 --stage-timings
+    python -m src.loadgen --tenants 50 --memory-profile
+
+Reports throughput and p50/p95/p99 invocation latency per concurrency level, upstream
+request counts, and the scaling limits the run ran into; --memory-profile adds the
+memory report of src.memory.
+"""
+
+import argparse
+import json
+import logging
+import math
+import multiprocessing
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, TypedDict
+from urllib.parse import parse_qs, urlparse
+
+from src.config import parse_birthdays_config
+from src.lambda_function import lambda_handler
+from src.memory import build_report as build_memory_report
+from src.memory import load_runs
+
+logger = logging.getLogger(__name__)
+
+# Median latency in seconds and lognormal sigma of each fake upstream, before scaling
+UPSTREAM_LATENCY = {
+    "anthropic": (2.0, 0.5),
+    "weather": (0.25, 0.6),
+    "national_days": (0.4, 0.6),
+    "national_day_details": (0.3, 0.8),
+    "discord": (0.15, 0.5),
+}
+MAX_LATENCY_SECONDS = 30.0
+DEFAULT_LATENCY_SCALE = 0.05  # Compress upstream latencies so runs finish quickly
+DEFAULT_ANTHROPIC_RPM = 4000
+DEFAULT_ANTHROPIC_TOKENS_PER_MINUTE = 400_000
+NATIONAL_DAYS_PER_DATE = 6
+
+SECRET_STRING_MAX_BYTES = 65536  # AWS Secrets Manager limit on a secret's value
+LINEAR_SCALING_EFFICIENCY = 0.7  # Below this fraction of linear speedup is the knee
+DAYS_IN_MONTH = [31, 29, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31]
+
+
+class Invocation(TypedDict):
+    tenant_id: str
+    secret_path: str
+    test_date: str
+    timeout_seconds: float
+    stage_timings: bool
+    memory_profile: bool
+
+
+class InvocationResult(TypedDict):
+    tenant_id: str
+    status_code: int
+    latency_seconds: float
+    error: str | None
+
+
+def sample_latency(upstream: str, scale: float) -> float:
+    """Draw a latency for an upstream from its lognormal distribution."""
+    median, sigma = UPSTREAM_LATENCY[upstream]
+    return min(random.lognormvariate(math.log(median), sigma), MAX_LATENCY_SECONDS) * scale
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of the values."""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    return ordered[max(math.ceil(pct / 100 * len(ordered)) - 1, 0)]
+
+
+class FakeAnthropicLimits:
+    """Account-wide request limit the fake Anthropic API enforces with 429s."""
+
+    def __init__(self, requests_per_minute: int):
+        self.requests_per_minute = requests_per_minute
+        self.lock = threading.Lock()
+        self.window: list[float] = []
+
+    def admit(self) -> tuple[bool, int]:
+        """Admit a request in the sliding one-minute window, returning (ok, remaining)."""
+        now = time.monotonic()
+        with self.lock:
+            self.window = [t for t in self.window if t > now - 60]
+            if len(self.window) >= self.requests_per_minute:
+                return False, 0
+            self.window.append(now)
+            return True, self.requests_per_minute - len(self.window)
+
+
+@dataclass
+class FakeUpstreams:
+    """State shared by the fake upstream server's request handlers."""
+
+    latency_scale: float
+    anthropic_limits: FakeAnthropicLimits
+    requests: Counter[str] = field(default_factory=Counter)
+    throttled: int = 0
+    weather_locations: set[tuple[str, str]] = field(default_factory=set)
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def record(self, upstream: str) -> None:
+        with self.lock:
+            self.requests[upstream] += 1
+
+    def reset(self) -> None:
+        with self.lock:
+            self.requests.clear()
+            self.throttled = 0
+            self.weather_locations.clear()
+
+
+def fake_weather(lat: str, lon: str) -> dict[str, Any]:
+    """An OpenWeatherMap One Call response varying with the location."""
+    rng = random.Random(f"{lat},{lon}")
+    now = int(time.time())
+    base = rng.uniform(20, 90)
+    descriptions = ["clear sky", "few clouds", "light rain", "overcast clouds", "light snow"]
+    daily = [
+        {
+            "dt": now + i * 86400,
+            "temp": {"max": base + rng.uniform(0, 15), "min": base - rng.uniform(0, 15)},
+            "feels_like": {"day": base, "night": base - 8, "eve": base - 3, "morn": base - 5},
+            "weather": [{"description": rng.choice(descriptions)}],
+            "pop": rng.random(),
+            "rain": rng.choice([0, 0, 1.5, 4]),
+            "moonrise": now + 3600,
+            "moonset": now + 7200,
+            "moon_phase": rng.random(),
+        }
+        for i in range(7)
+    ]
+    return {
+        "timezone": "America/New_York",
+        "current": {
+            "temp": base,
+            "feels_like": base - 2,
+            "humidity": rng.randint(20, 95),
+            "wind_speed": rng.uniform(0, 20),
+            "clouds": rng.randint(0, 100),
+            "weather": [{"description": rng.choice(descriptions)}],
+            "sunrise": now - 3600,
+            "sunset": now + 36000,
+        },
+        "daily": daily,
+    }
+
+
+def fake_national_days_page() -> str:
+    """A national days listing page with cards linking to detail pages."""
+    cards = "".join(
+        f'<div class="m-card--header"><a href="{{base}}/national-day/day-{i}">'
+        f"National Synthetic Day {i}</a></div>"
+        for i in range(NATIONAL_DAYS_PER_DATE)
+    )
+    return f"<html><body>{cards}</body></html>"
+
+
+def fake_national_day_details(slug: str) -> str:
+    return (
+        f"<article><p>{slug} celebrates synthetic load and everyone who keeps the bots "
+        f"running. It is observed annually on this date.</p><h2>History</h2><p>{slug} "
+        "was founded to find out how far the morning post scales.</p></article>"
+    )
+
+
+def make_handler(upstreams: FakeUpstreams, base_url: str) -> type[BaseHTTPRequestHandler]:
+    """Build a request handler serving every fake upstream."""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format: str, *args: Any) -> None:
+            pass
+
+        def respond(self, status: int, body: str, headers: dict[str, str] | None = None) -> None:
+            payload = body.encode()
+            self.send_response(status)
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def delay(self, upstream: str) -> None:
+            upstreams.record(upstream)
+            time.sleep(sample_latency(upstream, upstreams.latency_scale))
+
+        def do_GET(self) -> None:
+            url = urlparse(self.path)
+            if url.path == "/data/3.0/onecall":
+                query = parse_qs(url.query)
+                lat, lon = query.get("lat", [""])[0], query.get("lon", [""])[0]
+                with upstreams.lock:
+                    upstreams.weather_locations.add((lat, lon))
+                self.delay("weather")
+                body = json.dumps(fake_weather(lat, lon))
+                self.respond(200, body, {"Content-Type": "application/json"})
+            elif url.path.startswith("/national-day/"):
+                self.delay("national_day_details")
+                self.respond(200, fake_national_day_details(url.path.rsplit("/", 1)[-1]))
+            else:
+                self.delay("national_days")
+                self.respond(200, fake_national_days_page().replace("{base}", base_url))
+
+        def do_POST(self) -> None:
+            request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            if self.path.startswith("/v1/messages"):
+                self.handle_anthropic(request)
+            else:
+                self.delay("discord")
+                self.respond(204, "")
+
+        def handle_anthropic(self, request: dict[str, Any]) -> None:
+            admitted, remaining = upstreams.anthropic_limits.admit()
+            limits = upstreams.anthropic_limits
+            headers = {
+                "Content-Type": "application/json",
+                "anthropic-ratelimit-requests-limit": str(limits.requests_per_minute),
+                "anthropic-ratelimit-requests-remaining": str(remaining),
+                "anthropic-ratelimit-input-tokens-limit": str(DEFAULT_ANTHROPIC_TOKENS_PER_MINUTE),
+                "anthropic-ratelimit-output-tokens-limit": str(DEFAULT_ANTHROPIC_TOKENS_PER_MINUTE),
+            }
+            if not admitted:
+                with upstreams.lock:
+                    upstreams.throttled += 1
+                error = {"type": "error", "error": {"type": "rate_limit_error", "message": "429"}}
+                self.respond(429, json.dumps(error), {**headers, "retry-after": "1"})
+                return
+
+            self.delay("anthropic")
+            prompt = request["messages"][0]["content"]
+            text = f"Synthetic message for a {len(prompt)} character prompt. 🐾"
+            message = {
+                "id": f"msg_{random.getrandbits(64):x}",
+                "type": "message",
+                "role": "assistant",
+                "model": request["model"],
+                "content": [{"type": "text", "text": text}],
+                "stop_reason": "end_turn",
+                "stop_sequence": None,
+                "usage": {"input_tokens": len(prompt) // 4, "output_tokens": len(text) // 4},
+            }
+            self.respond(200, json.dumps(message), headers)
+
+    return Handler
+
+
+def start_fake_upstreams(upstreams: FakeUpstreams) -> tuple[ThreadingHTTPServer, str]:
+    """Serve the fake upstreams on a free local port in a background thread."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), BaseHTTPRequestHandler)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    server.RequestHandlerClass = make_handler(upstreams, base_url)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, base_url
+
+
+def synthesize_birthdays(rng: random.Random, count: int) -> str:
+    """A BIRTHDAYS_CONFIG string with count birthdays on random dates."""
+    entries = []
+    for i in range(count):
+        month = rng.randint(1, 12)
+        day = rng.randint(1, DAYS_IN_MONTH[month - 1])
+        entries.append(f"{month:02d}{day:02d}:Friend {i}")
+    return ",".join(entries)
+
+
+def synthesize_tenants(directory: Path, base_url: str, args: argparse.Namespace) -> list[Path]:
+    """Write a secrets file per synthetic tenant and return their paths."""
+    rng = random.Random(args.seed)
+    tenants, birthdays, locations = args.tenants, args.birthdays, args.locations
+    location_pool = [
+        (f"City {i}", f"{rng.uniform(25, 49):.4f}", f"{rng.uniform(-124, -67):.4f}")
+        for i in range(locations)
+    ]
+    paths = []
+    for i in range(tenants):
+        name, lat, lon = location_pool[i % locations]
+        secrets = {
+            "TENANT_ID": f"tenant-{i}",
+            "FELIX_DISCORD_WEBHOOK_URL": f"{base_url}/webhooks/tenant-{i}/felix",
+            "PEARL_DISCORD_WEBHOOK_URL": f"{base_url}/webhooks/tenant-{i}/pearl",
+            "ANTHROPIC_API_KEY": "sk-ant-loadgen",
+            "WEATHER_API_KEY": "loadgen",
+            "WEATHER_LOCATION": name,
+            "WEATHER_LAT": lat,
+            "WEATHER_LON": lon,
+            "BIRTHDAYS_CONFIG": synthesize_birthdays(rng, birthdays),
+        }
+        path = directory / f"tenant-{i}.json"
+        path.write_text(json.dumps(secrets))
+        paths.append(path)
+    return paths
+
+
+class LoadGenContext:
+    """A minimal Lambda context with a fixed timeout."""
+
+    def __init__(self, request_id: str, timeout_seconds: float):
+        self.aws_request_id = request_id
+        self.function_name = "loadgen"
+        self.memory_limit_in_mb = 512
+        self.deadline = time.monotonic() + timeout_seconds
+
+    def get_remaining_time_in_millis(self) -> int:
+        return int((self.deadline - time.monotonic()) * 1000)
+
+
+def init_worker(env: dict[str, str]) -> None:
+    """Point a worker process at the fake upstreams before the handler is imported."""
+    os.environ.update(env)
+
+
+def run_invocation(invocation: Invocation) -> InvocationResult:
+    """Run lambda_handler once for a tenant and time it."""
+    os.environ["SECRET_ARN"] = f"file://{invocation['secret_path']}"
+    event = {
+        "test_date": invocation["test_date"],
+        "force": True,
+        "stage_timings": invocation["stage_timings"],
+        "memory_profile": invocation["memory_profile"],
+    }
+    context = LoadGenContext(invocation["tenant_id"], invocation["timeout_seconds"])
+    start = time.perf_counter()
+    response = lambda_handler(event, context)
+    latency = time.perf_counter() - start
+
+    error = None
+    if response["statusCode"] != HTTPStatus.OK:
+        error = json.loads(response["body"]).get("error")
+    return InvocationResult(
+        tenant_id=invocation["tenant_id"],
+        status_code=response["statusCode"],
+        latency_seconds=latency,
+        error=error,
+    )
+
+
+@dataclass
+class StepResult:
+    concurrency: int
+    wall_seconds: float
+    results: list[InvocationResult]
+    upstream_requests: Counter[str]
+    throttled: int
+    unique_weather_locations: int
+
+    @property
+    def throughput(self) -> float:
+        return len(self.results) / self.wall_seconds if self.wall_seconds else 0.0
+
+
+def run_step(
+    invocations: list[Invocation],
+    concurrency: int,
+    env: dict[str, str],
+    upstreams: FakeUpstreams,
+) -> StepResult:
+    """Run every invocation with a pool of concurrency worker processes."""
+    upstreams.reset()
+    # Spawn rather than fork, since the fake upstream server's threads live in this process
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(concurrency, initializer=init_worker, initargs=(env,)) as pool:
+        # Wait for every worker to boot so the step measures invocations, not startup
+        pool.map(init_worker, [env] * concurrency, chunksize=1)
+        start = time.perf_counter()
+        results = list(pool.imap_unordered(run_invocation, invocations))
+        wall_seconds = time.perf_counter() - start
+
+    with upstreams.lock:
+        return StepResult(
+            concurrency=concurrency,
+            wall_seconds=wall_seconds,
+            results=results,
+            upstream_requests=Counter(upstreams.requests),
+            throttled=upstreams.throttled,
+            unique_weather_locations=len(upstreams.weather_locations),
+        )
+
+
+def analyze_configs(secret_paths: list[Path]) -> dict[str, Any]:
+    """Measure secret sizes and how many birthdays survive parsing."""
+    sizes = [path.stat().st_size for path in secret_paths]
+    largest = secret_paths[sizes.index(max(sizes))]
+    birthdays_config = json.loads(largest.read_text())["BIRTHDAYS_CONFIG"]
+    supplied = birthdays_config.count(":")
+
+    start = time.perf_counter()
+    parsed = parse_birthdays_config(birthdays_config)
+    parse_ms = (time.perf_counter() - start) * 1000
+    # parse_birthdays_config also maps Felix and Pearl's names to their birthdays
+    kept = sum(1 for key in parsed if key.isdigit())
+
+    return {
+        "max_secret_bytes": max(sizes),
+        "avg_secret_bytes": statistics.mean(sizes),
+        "over_secret_limit": sum(1 for size in sizes if size > SECRET_STRING_MAX_BYTES),
+        "birthdays_supplied": supplied,
+        "birthdays_kept": kept,
+        "parse_ms": parse_ms,
+    }
+
+
+def load_stage_timings(path: Path) -> dict[str, list[float]]:
+    """Collect per-stage durations from the stage_timings records of a run."""
+    durations: dict[str, list[float]] = {}
+    if not path.exists():
+        return durations
+    for run in load_runs([str(path)], event="stage_timings"):
+        for stage in run["stages"]:
+            durations.setdefault(stage["stage"], []).append(stage["duration_ms"])
+    return durations
+
+
+def build_report(
+    args: argparse.Namespace,
+    configs: dict[str, Any],
+    steps: list[StepResult],
+    stage_timings: dict[str, list[float]],
+) -> str:
+    """Summarize the run and call out where it stopped scaling."""
+    lines = [
+        f"Tenants: {args.tenants}, birthdays per tenant: {args.birthdays}, "
+        f"locations: {args.locations}, latency scale: {args.latency_scale}",
+        "",
+        "Configs",
+        f"  Secret size: max {configs['max_secret_bytes'] / 1024:.1f} KB, "
+        f"avg {configs['avg_secret_bytes'] / 1024:.1f} KB "
+        f"({configs['over_secret_limit']} over the {SECRET_STRING_MAX_BYTES // 1024} KB "
+        "Secrets Manager limit)",
+        f"  Birthdays kept after parsing: {configs['birthdays_kept']} of "
+        f"{configs['birthdays_supplied']} (largest config, parsed in "
+        f"{configs['parse_ms']:.1f} ms)",
+        "",
+        f"{'Workers':>8}{'inv':>7}{'errors':>8}{'inv/s':>9}{'p50 s':>8}{'p95 s':>8}"
+        f"{'p99 s':>8}{'eff.':>7}{'429s':>7}",
+    ]
+
+    findings = []
+    baseline = steps[0].throughput / steps[0].concurrency if steps else 0
+    knee = None
+    for step in steps:
+        latencies = [result["latency_seconds"] for result in step.results]
+        errors = sum(1 for result in step.results if result["status_code"] != HTTPStatus.OK)
+        efficiency = step.throughput / (baseline * step.concurrency) if baseline else 0
+        if knee is None and efficiency < LINEAR_SCALING_EFFICIENCY:
+            knee = step
+        lines.append(
+            f"{step.concurrency:>8}{len(step.results):>7}{errors:>8}{step.throughput:>9.2f}"
+            f"{percentile(latencies, 50):>8.2f}{percentile(latencies, 95):>8.2f}"
+            f"{percentile(latencies, 99):>8.2f}{efficiency:>7.0%}{step.throttled:>7}"
+        )
+        error_counts = Counter(result["error"] for result in step.results if result["error"])
+        for error, count in error_counts.most_common(3):
+            lines.append(f"{'':>10}{count} x {error}")
+
+    last = steps[-1]
+    lines += ["", f"Upstream requests (last step, {last.concurrency} workers)"]
+    for upstream, count in sorted(last.upstream_requests.items()):
+        lines.append(f"  {upstream:<22}{count:>8}")
+
+    if stage_timings:
+        lines += ["", f"{'Stage':<16}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"]
+        for stage, durations in stage_timings.items():
+            lines.append(
+                f"{stage:<16}{percentile(durations, 50):>9.0f}"
+                f"{percentile(durations, 95):>9.0f}{percentile(durations, 99):>9.0f}"
+            )
+        slowest = max(stage_timings, key=lambda stage: percentile(stage_timings[stage], 95))
+        findings.append(f"The {slowest} stage dominates p95 invocation time.")
+
+    if knee:
+        findings.append(
+            f"Throughput stops scaling linearly at {knee.concurrency} workers "
+            f"({knee.throughput:.2f} inv/s)."
+        )
+    if any(step.throttled for step in steps):
+        findings.append(
+            "The fake Anthropic API returned 429s: the client-side limiter only sees its own "
+            f"process, so {args.anthropic_rpm} RPM is shared unevenly between workers."
+        )
+    if configs["over_secret_limit"]:
+        findings.append(
+            f"{configs['over_secret_limit']} tenant secrets exceed the Secrets Manager limit; "
+            "BIRTHDAYS_CONFIG that large needs to live elsewhere (S3 or DynamoDB)."
+        )
+    if configs["birthdays_kept"] < configs["birthdays_supplied"]:
+        dropped = configs["birthdays_supplied"] - configs["birthdays_kept"]
+        findings.append(
+            f"{dropped} birthdays were silently dropped: birthdays_config keeps one name per "
+            "date, so birthdays sharing a date overwrite each other."
+        )
+    if last.unique_weather_locations and last.upstream_requests["weather"]:
+        per_location = last.upstream_requests["weather"] / last.unique_weather_locations
+        if per_location > 1:
+            findings.append(
+                f"Weather was fetched {per_location:.1f}x per unique location; tenants sharing "
+                "a location could share one request."
+            )
+
+    lines += ["", "Scaling limits"]
+    lines += [f"  - {finding}" for finding in findings] or ["  None observed."]
+    return "\n".join(lines)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Run lambda_handler under synthetic load")
+    parser.add_argument("--tenants", type=int, default=200, help="Synthetic tenants")
+    parser.add_argument("--birthdays", type=int, default=20, help="Birthdays per tenant")
+    parser.add_argument("--locations", type=int, default=50, help="Distinct weather locations")
+    parser.add_argument(
+        "--concurrency", default="1,4,16", help="Comma-separated worker counts to step through"
+    )
+    parser.add_argument(
+        "--latency-scale",
+        type=float,
+        default=DEFAULT_LATENCY_SCALE,
+        help="Multiplier on the fake upstream latencies (1.0 is realistic)",
+    )
+    parser.add_argument("--anthropic-rpm", type=int, default=DEFAULT_ANTHROPIC_RPM)
+    parser.add_argument("--timeout", type=float, default=60, help="Lambda timeout in seconds")
+    parser.add_argument(
+        "--date", help="Birthday date to run as, MMDD (default: today)", default=None
+    )
+    parser.add_argument("--stage-timings", action="store_true", help="Time each stage")
+    parser.add_argument(
+        "--memory-profile",
+        action="store_true",
+        help="Profile each stage's memory with tracemalloc (slows the stages down)",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    args.tenants = max(args.tenants, 1)
+    args.locations = max(min(args.locations, args.tenants), 1)
+    concurrency_levels = [int(level) for level in args.concurrency.split(",") if level.strip()]
+
+    upstreams = FakeUpstreams(args.latency_scale, FakeAnthropicLimits(args.anthropic_rpm))
+    server, base_url = start_fake_upstreams(upstreams)
+    try:
+        with tempfile.TemporaryDirectory(prefix="felix-pearl-loadgen-") as tmp:
+            directory = Path(tmp)
+            secrets_dir = directory / "secrets"
+            secrets_dir.mkdir()
+            print(f"Synthesizing {args.tenants} tenants…", file=sys.stderr)
+            secret_paths = synthesize_tenants(secrets_dir, base_url, args)
+            configs = analyze_configs(secret_paths)
+
+            profile_path = directory / "stage-profile.jsonl"
+            env = {
+                "ANTHROPIC_BASE_URL": base_url,
+                "WEATHER_API_URL": f"{base_url}/data/3.0/onecall",
+                # The fake upstream only serves OpenWeatherMap; keep NWS traffic off the real API
+                "WEATHER_PROVIDERS": "openweathermap",
+                "NATIONAL_DAYS_BASE_URL": base_url,
+                "STATE_DIR": str(directory / "state"),
+                "ARCHIVE_DIR": str(directory / "archive"),
+                "MEMORY_PROFILE_PATH": str(profile_path),
+                "LOG_LEVEL": os.environ.get("LOG_LEVEL", "CRITICAL"),
+                "LOG_SAMPLE_RATE": "0",
+            }
+            test_date = args.date or datetime.now().strftime("%m%d")
+            invocations = [
+                Invocation(
+                    tenant_id=path.stem,
+                    secret_path=str(path),
+                    test_date=test_date,
+                    timeout_seconds=args.timeout,
+                    stage_timings=args.stage_timings,
+                    memory_profile=args.memory_profile,
+                )
+                for path in secret_paths
+            ]
+
+            steps = []
+            for concurrency in concurrency_levels:
+                print(
+                    f"Running {len(invocations)} invocations on {concurrency} workers…",
+                    file=sys.stderr,
+                )
+                steps.append(run_step(invocations, concurrency, env, upstreams))
+            stage_timings = load_stage_timings(profile_path)
+            memory_runs = load_runs([str(profile_path)]) if profile_path.exists() else []
+    finally:
+        server.shutdown()
+
+    print(build_report(args, configs, steps, stage_timings))
+    if memory_runs:
+        print("\n" + build_memory_report(memory_runs))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
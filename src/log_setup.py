@@ -0,0 +1,145 @@
+"""
+Structured JSON logging for the Lambda handlers.
+
+Every record is written as a single JSON line. Dict messages (the repo's
+{"event": ...} style) become top-level fields; plain messages keep their
+%-style arguments, so they are only formatted if the record is emitted.
+Records are buffered and written once per invocation by flush_logs().
+"""
+
+import contextvars
+import json
+import logging
+import os
+import random
+import sys
+from collections.abc import Callable
+from concurrent.futures import Executor, Future
+from contextvars import ContextVar
+from logging.handlers import MemoryHandler
+from typing import Any
+
+LOGGER_NAME = "src"
+BUFFER_CAPACITY = 500  # Records buffered before an early flush
+LARGE_PAYLOAD_CHARS = 200  # String fields longer than this are payloads subject to sampling
+DEFAULT_SAMPLE_RATE = 0.1  # Fraction of invocations that log large payloads in full
+
+
+class InvocationState:
+    """
+    Per-invocation fields added to every record, and the payload sampling decision.
+    Held in a ContextVar, so concurrent runs (e.g. daemon tenants) keep their own
+    fields, and worker threads started with submit_in_context inherit them.
+    """
+
+    __slots__ = ("fields", "sample_payloads")
+
+    def __init__(self, fields: dict[str, Any] | None = None, sample_payloads: bool = False):
+        self.fields = fields or {}
+        self.sample_payloads = sample_payloads
+
+
+_invocation: ContextVar[InvocationState] = ContextVar("invocation")
+NO_INVOCATION = InvocationState()  # Records logged before start_invocation
+
+
+def sample_payload(value: Any, sample_payloads: bool) -> Any:
+    """Truncate large string payloads unless this invocation is sampled for full payloads."""
+    if sample_payloads or not isinstance(value, str) or len(value) <= LARGE_PAYLOAD_CHARS:
+        return value
+    return f"{value[:LARGE_PAYLOAD_CHARS]}… [{len(value)} chars]"
+
+
+class InvocationFilter(logging.Filter):
+    """
+    Attach the invocation state to records as they're logged, since buffered records
+    are only formatted later, possibly from another thread.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        invocation = _invocation.get(NO_INVOCATION)
+        record.invocation_fields = invocation.fields
+        record.sample_payloads = invocation.sample_payloads
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """Format records as single-line JSON objects."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        fields: dict[str, Any] = {
+            "timestamp": record.created,
+            "level": record.levelname,
+            "logger": record.name,
+            **getattr(record, "invocation_fields", {}),
+        }
+
+        if isinstance(record.msg, dict):
+            sample_payloads = getattr(record, "sample_payloads", False)
+            fields.update(
+                {key: sample_payload(value, sample_payloads) for key, value in record.msg.items()}
+            )
+        else:
+            fields["message"] = record.getMessage()
+
+        if record.exc_info:
+            fields["exception"] = self.formatException(record.exc_info)
+
+        return json.dumps(fields, default=str, ensure_ascii=False)
+
+
+def configure_logging() -> logging.Logger:
+    """
+    Configure the package logger with JSON output, buffered until flush_logs().
+    Safe to call more than once; the level comes from LOG_LEVEL (default INFO).
+    """
+    logger = logging.getLogger(LOGGER_NAME)
+    logger.setLevel(os.environ.get("LOG_LEVEL", "INFO").upper())
+    if any(isinstance(handler, MemoryHandler) for handler in logger.handlers):
+        return logger
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(JsonFormatter())
+    # Errors flush immediately so they're never lost to a crash or timeout
+    buffer_handler = MemoryHandler(BUFFER_CAPACITY, flushLevel=logging.ERROR, target=stream_handler)
+    buffer_handler.addFilter(InvocationFilter())
+    logger.addHandler(buffer_handler)
+    # Don't also emit through the Lambda runtime's root handler
+    logger.propagate = False
+    return logger
+
+
+def start_invocation(**fields: Any) -> None:
+    """
+    Start logging for a new invocation.
+
+    Args:
+        fields: Fields added to every record of the invocation, e.g. the request ID
+    """
+    configure_logging()
+
+    # Debug logging always includes full payloads; otherwise sample them per invocation
+    sample_rate = float(os.environ.get("LOG_SAMPLE_RATE", DEFAULT_SAMPLE_RATE))
+    _invocation.set(
+        InvocationState(
+            fields={key: value for key, value in fields.items() if value is not None},
+            sample_payloads=(
+                logging.getLogger(LOGGER_NAME).isEnabledFor(logging.DEBUG)
+                or random.random() < sample_rate
+            ),
+        )
+    )
+
+
+def submit_in_context[R](executor: Executor, func: Callable[..., R], *args: Any) -> Future[R]:
+    """
+    Submit func to a thread pool in a copy of the current context, so records it logs
+    keep the invocation's fields. Pool threads otherwise start with an empty context.
+    """
+    return executor.submit(contextvars.copy_context().run, func, *args)
+
+
+def flush_logs() -> None:
+    """Write out all buffered records. Call once at the end of each invocation."""
+    for handler in logging.getLogger(LOGGER_NAME).handlers:
+        handler.flush()
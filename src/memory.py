@@ -0,0 +1,290 @@
+"""
+Opt-in per-stage memory profiling, plus an offline report for right-sizing the Lambdas.
+
+Enable it with the MEMORY_PROFILE environment variable or "memory_profile": true in
+the event. Each stage records its duration, peak RSS and the top tracemalloc
+allocation sites; the whole run is logged as a "memory_profile" event and appended to
+MEMORY_PROFILE_PATH.
+
+"stage_timings": true in the event records only each stage's duration, timed with
+perf_counter and free of tracemalloc's overhead, as a "stage_timings" event.
+
+Report on recorded runs (JSON lines, raw or exported from CloudWatch) with:
+
+    python -m src.memory report /tmp/memory-profile.jsonl
+"""
+
+import argparse
+import json
+import logging
+import math
+import os
+import resource
+import sys
+import time
+import tracemalloc
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Any, TypedDict
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROFILE_PATH = "/tmp/memory-profile.jsonl"
+TOP_ALLOCATIONS = 5
+TRACEMALLOC_FRAMES = 1
+
+# Lambda sizing
+MIN_MEMORY_MB = 128
+MAX_MEMORY_MB = 10240
+MEMORY_STEP_MB = 64
+HEADROOM = 1.3  # Multiplier over the observed peak RSS
+FULL_VCPU_MEMORY_MB = 1769  # Lambda allocates one full vCPU at this memory size
+
+
+class AllocationSite(TypedDict):
+    site: str
+    size_kb: float
+    count: int
+
+
+class StageTiming(TypedDict):
+    stage: str
+    duration_ms: float
+
+
+class StageMemory(TypedDict):
+    stage: str
+    duration_ms: float
+    rss_before_mb: float
+    rss_after_mb: float
+    peak_rss_mb: float
+    traced_peak_mb: float
+    top_allocations: list[AllocationSite]
+
+
+def read_proc_status_mb(field: str) -> float | None:
+    """Read a memory field (e.g. VmRSS, VmHWM) from /proc/self/status, in MB."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith(f"{field}:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def current_rss_mb() -> float:
+    """Current resident set size of the process in MB."""
+    rss = read_proc_status_mb("VmRSS")
+    if rss is not None:
+        return rss
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size since the last reset_peak_rss(), in MB."""
+    peak = read_proc_status_mb("VmHWM")
+    if peak is not None:
+        return peak
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def reset_peak_rss() -> None:
+    """
+    Reset the kernel's peak RSS counter so the next reading covers a single stage.
+    Only supported on Linux; elsewhere the peak stays process-wide.
+    """
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+class MemoryProfiler:
+    """Records memory usage for each stage of an invocation when enabled."""
+
+    def __init__(self, enabled: bool, track_memory: bool = True):
+        self.enabled = enabled
+        self.track_memory = enabled and track_memory
+        self.stages: list[StageMemory | StageTiming] = []
+        self.baseline_rss_mb = current_rss_mb() if self.track_memory else 0.0
+        # Only stop tracing in finish() if this profiler started it
+        self.started_tracing = self.track_memory and not tracemalloc.is_tracing()
+        if self.started_tracing:
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+
+    @classmethod
+    def from_event(cls, event: dict[str, Any]) -> "MemoryProfiler":
+        """
+        Build a profiler, enabled by the event's memory_profile flag or MEMORY_PROFILE,
+        or timing stages only with the event's stage_timings flag.
+        """
+        enabled_by_env = os.environ.get("MEMORY_PROFILE", "").lower() in ("1", "true")
+        track_memory = bool(event.get("memory_profile")) or enabled_by_env
+        return cls(track_memory or bool(event.get("stage_timings")), track_memory)
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Record memory usage of the code run inside the block as a named stage."""
+        if not self.enabled:
+            yield
+            return
+        if not self.track_memory:
+            start = time.perf_counter()
+            try:
+                yield
+            finally:
+                duration_ms = (time.perf_counter() - start) * 1000
+                self.stages.append(StageTiming(stage=name, duration_ms=round(duration_ms, 1)))
+            return
+
+        reset_peak_rss()
+        tracemalloc.reset_peak()
+        before = tracemalloc.take_snapshot()
+        rss_before = current_rss_mb()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration_ms = (time.perf_counter() - start) * 1000
+            after = tracemalloc.take_snapshot()
+            _, traced_peak = tracemalloc.get_traced_memory()
+            top_allocations = [
+                AllocationSite(
+                    site=str(stat.traceback),
+                    size_kb=round(stat.size_diff / 1024, 1),
+                    count=stat.count_diff,
+                )
+                for stat in after.compare_to(before, "lineno")[:TOP_ALLOCATIONS]
+            ]
+            self.stages.append(
+                StageMemory(
+                    stage=name,
+                    duration_ms=round(duration_ms, 1),
+                    rss_before_mb=round(rss_before, 1),
+                    rss_after_mb=round(current_rss_mb(), 1),
+                    peak_rss_mb=round(peak_rss_mb(), 1),
+                    traced_peak_mb=round(traced_peak / 1024 / 1024, 1),
+                    top_allocations=top_allocations,
+                )
+            )
+
+    def finish(self, context: Any) -> None:
+        """Log the recorded run, append it to MEMORY_PROFILE_PATH and stop tracing."""
+        if not self.enabled:
+            return
+        if self.started_tracing:
+            # Later invocations in a warm container shouldn't keep paying for tracemalloc
+            tracemalloc.stop()
+            self.started_tracing = False
+
+        if not self.track_memory:
+            self.write({"event": "stage_timings", "stages": self.stages})
+            return
+
+        record = {
+            "event": "memory_profile",
+            "function": getattr(context, "function_name", None),
+            "memory_size_mb": int(getattr(context, "memory_limit_in_mb", 0) or 0) or None,
+            "baseline_rss_mb": round(self.baseline_rss_mb, 1),
+            "max_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+            "stages": self.stages,
+        }
+        self.write(record)
+
+    def write(self, record: dict[str, Any]) -> None:
+        """Log a record and append it to MEMORY_PROFILE_PATH."""
+        logger.info(record)
+        try:
+            with open(os.environ.get("MEMORY_PROFILE_PATH", DEFAULT_PROFILE_PATH), "a") as f:
+                f.write(json.dumps(record) + "\n")
+        except OSError as e:
+            logger.error("❌ Failed to write memory profile: %s", e)
+
+
+def load_runs(paths: list[str], event: str = "memory_profile") -> list[dict[str, Any]]:
+    """Load records of an event from JSON lines files, skipping any other lines."""
+    runs = []
+    for path in paths:
+        with open(path) as f:
+            for line in f:
+                # CloudWatch exports prefix each line with a timestamp and request ID
+                start = line.find("{")
+                if start == -1:
+                    continue
+                try:
+                    record = json.loads(line[start:])
+                except json.JSONDecodeError:
+                    continue
+                if record.get("event") == event:
+                    runs.append(record)
+    return runs
+
+
+def recommend_memory_mb(peak_mb: float) -> int:
+    """Recommend a Lambda memory size covering the observed peak with headroom."""
+    needed = peak_mb * HEADROOM
+    size = math.ceil(needed / MEMORY_STEP_MB) * MEMORY_STEP_MB
+    return min(max(size, MIN_MEMORY_MB), MAX_MEMORY_MB)
+
+
+def build_report(runs: list[dict[str, Any]]) -> str:
+    """Summarize recorded runs per stage and recommend a memory size."""
+    if not runs:
+        return "No memory_profile records found."
+
+    stage_peaks: dict[str, list[float]] = {}
+    stage_durations: dict[str, list[float]] = {}
+    top_sites: dict[str, dict[str, float]] = {}
+    for run in runs:
+        for stage in run["stages"]:
+            stage_peaks.setdefault(stage["stage"], []).append(stage["peak_rss_mb"])
+            stage_durations.setdefault(stage["stage"], []).append(stage["duration_ms"])
+            sites = top_sites.setdefault(stage["stage"], {})
+            for allocation in stage["top_allocations"]:
+                sites[allocation["site"]] = max(
+                    sites.get(allocation["site"], 0.0), allocation["size_kb"]
+                )
+
+    rss_values = [run["max_rss_mb"] for run in runs]
+    rss_values += [peak for peaks in stage_peaks.values() for peak in peaks]
+    max_rss = max(rss_values, default=0.0)
+    configured = {run["memory_size_mb"] for run in runs if run.get("memory_size_mb")}
+    recommended = recommend_memory_mb(max_rss)
+
+    lines = [f"Runs analyzed: {len(runs)}", ""]
+    lines.append(f"{'Stage':<16}{'peak RSS max':>14}{'duration avg':>14}")
+    for name, peaks in stage_peaks.items():
+        durations = stage_durations[name]
+        lines.append(f"{name:<16}{max(peaks):>11.1f} MB{sum(durations) / len(durations):>11.0f} ms")
+        for site, size_kb in sorted(top_sites[name].items(), key=lambda s: -s[1])[:3]:
+            lines.append(f"    {size_kb:>9.1f} KB  {site}")
+
+    lines += [
+        "",
+        f"Max RSS across runs: {max_rss:.1f} MB",
+        f"Configured memory: {', '.join(f'{m} MB' for m in sorted(configured)) or 'unknown'}",
+        f"Recommended MemorySize: {recommended} MB ({HEADROOM:.0%} of peak, "
+        f"{MEMORY_STEP_MB} MB steps)",
+        f"CPU share at recommended size: {min(recommended / FULL_VCPU_MEMORY_MB, 1):.0%} of a "
+        f"vCPU. Stages dominated by CPU rather than network may finish faster at up to "
+        f"{FULL_VCPU_MEMORY_MB} MB.",
+    ]
+    return "\n".join(lines)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Memory profiling tools")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    report_parser = subparsers.add_parser("report", help="Recommend a memory size from runs")
+    report_parser.add_argument("paths", nargs="+", help="JSON lines files with recorded runs")
+    args = parser.parse_args(argv)
+
+    if args.command == "report":
+        print(build_report(load_runs(args.paths)))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,260 @@
+"""
+On-demand CPU profiling of a handler invocation.
+
+Enable it per invocation with the event's "profile" flag:
+
+    {"profile": true}       deterministic cProfile of the handler thread, saved as pstats
+    {"profile": "sample"}   stack sampling of every thread, saved as collapsed stacks
+
+Output is written to PROFILE_DIR (default /tmp/felix-pearl-profiles) and, if
+PROFILE_BUCKET is set, uploaded to that S3 bucket. The hottest functions are added to
+the response body. View the output with:
+
+    python -m pstats /tmp/felix-pearl-profiles/<file>.pstats
+    flamegraph.pl /tmp/felix-pearl-profiles/<file>.collapsed > flame.svg   (or speedscope)
+"""
+
+import cProfile
+import functools
+import io
+import json
+import logging
+import math
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from collections.abc import Callable
+from pathlib import Path
+from types import CodeType, FrameType
+from typing import Any, Literal, TypedDict
+
+import boto3
+
+from src.log_setup import flush_logs
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROFILE_DIR = "/tmp/felix-pearl-profiles"
+PROFILE_S3_PREFIX = "profiles/"
+TOP_FUNCTIONS = 10
+DEFAULT_SAMPLE_INTERVAL_MS = 5
+MIN_SAMPLE_INTERVAL_MS = 1  # Shorter intervals would have the sampler starve the handler
+
+ProfileMode = Literal["cprofile", "sample"]
+Handler = Callable[[dict[str, Any], Any], dict[str, Any]]
+
+
+class HotFunction(TypedDict):
+    function: str
+    self_ms: float
+    total_ms: float
+    calls: int | None  # Only known for cProfile
+
+
+class ProfileSummary(TypedDict):
+    mode: ProfileMode
+    duration_ms: float
+    output: str
+    top_functions: list[HotFunction]
+
+
+def code_label(code: CodeType) -> str:
+    """A short, space-free label for a function, e.g. "weather.py:get_weather"."""
+    return f"{os.path.basename(code.co_filename)}:{code.co_qualname}"
+
+
+def parse_interval_ms(value: Any) -> float:
+    """
+    Parse the event's sampling interval, clamped to MIN_SAMPLE_INTERVAL_MS; a missing
+    or invalid value falls back to the default rather than failing the invocation.
+    """
+    if value is None:
+        return DEFAULT_SAMPLE_INTERVAL_MS
+    try:
+        interval_ms = float(value)
+        if not math.isfinite(interval_ms):
+            raise ValueError(f"{interval_ms} is not finite")
+    except (TypeError, ValueError):
+        logger.warning("⚠️ Invalid profile_interval_ms %r, using the default", value)
+        return DEFAULT_SAMPLE_INTERVAL_MS
+    return max(interval_ms, MIN_SAMPLE_INTERVAL_MS)
+
+
+class StackSampler:
+    """Samples the stacks of every other thread at a fixed interval."""
+
+    def __init__(self, interval_seconds: float):
+        self.interval_seconds = interval_seconds
+        self.stacks: Counter[str] = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval_seconds):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                labels = []
+                current: FrameType | None = frame
+                while current is not None:
+                    labels.append(code_label(current.f_code))
+                    current = current.f_back
+                labels.append(f"thread:{names.get(thread_id, thread_id)}")
+                self.stacks[";".join(reversed(labels))] += 1
+            self.samples += 1
+
+    def collapsed(self) -> str:
+        """The samples in collapsed-stack format, as read by flamegraph.pl and speedscope."""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def top_functions(self, limit: int = TOP_FUNCTIONS) -> list[HotFunction]:
+        """The functions with the most samples at the top of a stack."""
+        self_samples: Counter[str] = Counter()
+        total_samples: Counter[str] = Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(";")[1:]  # Drop the thread label
+            if not frames:
+                continue
+            self_samples[frames[-1]] += count
+            for function in set(frames):
+                total_samples[function] += count
+
+        interval_ms = self.interval_seconds * 1000
+        return [
+            HotFunction(
+                function=function,
+                self_ms=round(count * interval_ms, 1),
+                total_ms=round(total_samples[function] * interval_ms, 1),
+                calls=None,
+            )
+            for function, count in self_samples.most_common(limit)
+        ]
+
+
+class InvocationProfiler:
+    """Profiles a handler invocation with cProfile or stack sampling."""
+
+    def __init__(self, mode: ProfileMode, sample_interval_ms: float = DEFAULT_SAMPLE_INTERVAL_MS):
+        self.mode = mode
+        self.profile = cProfile.Profile() if mode == "cprofile" else None
+        self.sampler = StackSampler(sample_interval_ms / 1000) if mode == "sample" else None
+        self.duration_ms = 0.0
+        self._start = 0.0
+
+    @classmethod
+    def from_event(cls, event: dict[str, Any]) -> "InvocationProfiler | None":
+        """Build a profiler from the event's "profile" flag, or None if it isn't set."""
+        flag = event.get("profile")
+        if not flag:
+            return None
+        mode: ProfileMode = "sample" if flag == "sample" else "cprofile"
+        return cls(mode, parse_interval_ms(event.get("profile_interval_ms")))
+
+    def __enter__(self) -> "InvocationProfiler":
+        self._start = time.perf_counter()
+        if self.profile:
+            self.profile.enable()
+        if self.sampler:
+            self.sampler.start()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        if self.profile:
+            self.profile.disable()
+        if self.sampler:
+            self.sampler.stop()
+        self.duration_ms = (time.perf_counter() - self._start) * 1000
+
+    def top_functions(self, limit: int = TOP_FUNCTIONS) -> list[HotFunction]:
+        """The functions with the most time spent in their own code."""
+        if self.sampler:
+            return self.sampler.top_functions(limit)
+
+        stats = pstats.Stats(self.profile, stream=io.StringIO())
+        # Stats entries are (primitive calls, calls, own time, cumulative time, callers)
+        entries = sorted(stats.stats.items(), key=lambda item: -item[1][2])[:limit]
+        return [
+            HotFunction(
+                function=f"{os.path.basename(filename)}:{line}({name})",
+                self_ms=round(total_time * 1000, 1),
+                total_ms=round(cumulative_time * 1000, 1),
+                calls=calls,
+            )
+            for (filename, line, name), (_, calls, total_time, cumulative_time, _) in entries
+        ]
+
+    def write(self, name: str) -> str:
+        """
+        Write the profile to PROFILE_DIR and, if PROFILE_BUCKET is set, upload it to S3.
+
+        Returns:
+            Where the profile was written, as a path or s3:// URL
+        """
+        directory = Path(os.environ.get("PROFILE_DIR", DEFAULT_PROFILE_DIR))
+        directory.mkdir(parents=True, exist_ok=True)
+        if self.sampler:
+            path = directory / f"{name}.collapsed"
+            path.write_text(self.sampler.collapsed())
+        else:
+            path = directory / f"{name}.pstats"
+            pstats.Stats(self.profile, stream=io.StringIO()).dump_stats(path)
+
+        if bucket := os.environ.get("PROFILE_BUCKET"):
+            key = f"{PROFILE_S3_PREFIX}{path.name}"
+            boto3.client("s3").upload_file(str(path), bucket, key)
+            return f"s3://{bucket}/{key}"
+        return str(path)
+
+    def finish(self, context: Any) -> ProfileSummary:
+        """Write the profile and summarize it."""
+        function_name = getattr(context, "function_name", None) or "handler"
+        request_id = getattr(context, "aws_request_id", None) or f"{time.time():.0f}"
+        summary = ProfileSummary(
+            mode=self.mode,
+            duration_ms=round(self.duration_ms, 1),
+            output=self.write(f"{function_name}-{request_id}"),
+            top_functions=self.top_functions(),
+        )
+        logger.info({"event": "profile", **summary})
+        return summary
+
+
+def profiled(handler: Handler) -> Handler:
+    """
+    Run a Lambda handler under InvocationProfiler when the event asks for it, and add
+    the profile summary to the response body.
+    """
+
+    @functools.wraps(handler)
+    def wrapper(event: dict[str, Any], context: Any) -> dict[str, Any]:
+        profiler = InvocationProfiler.from_event(event)
+        if profiler is None:
+            return handler(event, context)
+
+        with profiler:
+            response = handler(event, context)
+
+        try:
+            body = json.loads(response.get("body") or "{}")
+            body["profile"] = profiler.finish(context)
+            response["body"] = json.dumps(body)
+        except Exception as e:
+            logger.error("❌ Failed to write profile: %s", e)
+        finally:
+            flush_logs()
+        return response
+
+    return wrapper
@@ -0,0 +1,177 @@
+"""
+Prompt token analyzer.
+
+Renders every prompt in prompts.py with representative inputs and reports estimated
+token counts per section, for both the full and the compact prompt variants:
+
+    python -m src.prompt_tokens
+    python -m src.prompt_tokens --sections
+
+Counts come from an offline estimator, so they track Claude's tokenizer closely
+enough to compare variants but aren't exact.
+"""
+
+import argparse
+import sys
+from datetime import datetime, timedelta
+
+import pytz
+
+from src.ai import build_national_days_prompt, build_weather_prompt
+from src.prompts import FELIX, PEARL, get_system_prompt
+from src.services.birthdays import build_birthday_prompt, build_thank_you_prompt
+from src.services.national_days import NationalDay
+from src.services.weather import (
+    CurrentWeather,
+    DailyForecast,
+    DailyWeather,
+    WeatherData,
+)
+from src.tokens import estimate_tokens
+
+LABEL_CHARS = 40
+
+
+def split_sections(prompt: str) -> list[tuple[str, str]]:
+    """
+    Split a prompt into (label, text) sections labelled by their first line.
+    Bullet, numbered and indented lines belong to the section above them.
+    """
+    sections: list[list[str]] = []
+    for line in prompt.splitlines():
+        if not line.strip():
+            continue
+        if sections and (line.startswith(("-", " ")) or line[0].isdigit()):
+            sections[-1].append(line)
+        else:
+            sections.append([line])
+
+    return [
+        (
+            lines[0][:LABEL_CHARS] + ("…" if len(lines[0]) > LABEL_CHARS else ""),
+            "\n".join(lines),
+        )
+        for lines in sections
+    ]
+
+
+def sample_weather_data() -> WeatherData:
+    """Representative weather data for a spring morning."""
+    tz = pytz.timezone("America/New_York")
+    today = tz.localize(datetime(2025, 4, 23, 7, 0))
+    return WeatherData(
+        current=CurrentWeather(
+            temp=54,
+            feels_like=51,
+            humidity=72,
+            wind_speed=9,
+            wind_gust=17,
+            description="broken clouds",
+            clouds=75,
+        ),
+        today=DailyWeather(
+            high=66,
+            low=48,
+            feels_like={"day": 64, "night": 47, "eve": 58, "morn": 50},
+            description="light rain",
+            pop=0.6,
+            rain=3,
+            snow=0,
+        ),
+        upcoming=[
+            DailyForecast(
+                date=today + timedelta(days=offset),
+                high=60 + offset,
+                low=45 + offset,
+                description=description,
+                pop=pop,
+                rain=rain,
+                snow=0,
+            )
+            for offset, description, pop, rain in [
+                (1, "overcast clouds", 0.1, 0),
+                (2, "moderate rain", 0.8, 6),
+                (3, "scattered clouds", 0.2, 0),
+                (4, "clear sky", 0.0, 0),
+                (5, "light rain", 0.4, 1),
+            ]
+        ],
+        sunrise=today.replace(hour=6, minute=12),
+        sunset=today.replace(hour=19, minute=41),
+        moonrise=today.replace(hour=3, minute=5),
+        moonset=today.replace(hour=14, minute=20),
+        moon_phase=0.84,
+    )
+
+
+def sample_national_days() -> list[NationalDay]:
+    """Representative national days, with details as filled in by enrichment."""
+    return [
+        NationalDay(
+            name="National Picnic Day",
+            url="https://www.nationaldaycalendar.com/national-day/national-picnic-day-april-23",
+            summary="National Picnic Day encourages everyone to pack a basket and eat outdoors.",
+            occurrence_text="National Picnic Day is observed annually on April 23.",
+            history="Picnics grew popular in the 1800s as public parks opened across cities.",
+        ),
+        NationalDay(
+            name="National Cherry Cheesecake Day",
+            url="https://www.nationaldaycalendar.com/national-day/national-cherry-cheesecake-day",
+            summary="Cherry cheesecake pairs a creamy filling with a bright cherry topping.",
+        ),
+        NationalDay(
+            name="National Take a Chance Day",
+            url="https://www.nationaldaycalendar.com/national-day/national-take-a-chance-day",
+        ),
+    ]
+
+
+def render_prompts(compact: bool) -> dict[str, str]:
+    """Render every prompt with representative inputs."""
+    return {
+        "system (Felix)": get_system_prompt(FELIX, compact),
+        "system (Pearl)": get_system_prompt(PEARL, compact),
+        "own birthday": build_birthday_prompt(
+            {"name": PEARL["name"], "date": PEARL["birthday"]}, PEARL, compact
+        ),
+        "other birthday": build_birthday_prompt({"name": "Alex", "date": "0501"}, FELIX, compact),
+        "thank you": build_thank_you_prompt(PEARL, compact),
+        "national days": build_national_days_prompt(sample_national_days(), compact),
+        "weather": build_weather_prompt("Boston,MA,US", sample_weather_data(), compact),
+    }
+
+
+def build_report(show_sections: bool) -> str:
+    """Compare estimated token counts of the full and compact prompt variants."""
+    full = render_prompts(compact=False)
+    compact = render_prompts(compact=True)
+
+    lines = [f"{'Prompt':<18}{'full':>8}{'compact':>9}{'saved':>8}"]
+    total_full = total_compact = 0
+    for name, prompt in full.items():
+        full_tokens = estimate_tokens(prompt)
+        compact_tokens = estimate_tokens(compact[name])
+        total_full += full_tokens
+        total_compact += compact_tokens
+        saved = 1 - compact_tokens / full_tokens if full_tokens else 0
+        lines.append(f"{name:<18}{full_tokens:>8}{compact_tokens:>9}{saved:>8.0%}")
+
+        if show_sections:
+            for variant, text in (("full", prompt), ("compact", compact[name])):
+                for label, section in split_sections(text):
+                    lines.append(f"    {variant:<8}{estimate_tokens(section):>5}  {label}")
+
+    saved = 1 - total_compact / total_full if total_full else 0
+    lines.append(f"{'total':<18}{total_full:>8}{total_compact:>9}{saved:>8.0%}")
+    return "\n".join(lines)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Estimate prompt token counts")
+    parser.add_argument("--sections", action="store_true", help="Show per-section counts")
+    args = parser.parse_args(argv)
+    print(build_report(args.sections))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -1,3 +1,4 @@
+import os
 from typing import TypedDict
 
 
@@ -10,6 +11,7 @@ class CharacterInfo(TypedDict):
     birthday: str
     emojis: list[str]
     pun_focus: str
+    puns: list[str]
 
 
 FELIX: CharacterInfo = {
@@ -24,6 +26,13 @@ FELIX: CharacterInfo = {
     "birthday": "0716",
     "emojis": ["🐱", "🎩", "📚", "🧐", "🕰️", "✒️", "🍷", "🧵"],
     "pun_focus": "feline puns and witty asides",
+    "puns": [
+        "Truly a day worth pawsing for.",
+        "I find these observances utterly purr-suasive.",
+        "Consider me a connoisseur of the cat-endar.",
+        "Whisker me away to the festivities, I say.",
+        "It would be a cat-astrophe to let today slip by unnoticed.",
+    ],
 }
 
 PEARL: CharacterInfo = {
@@ -38,14 +47,39 @@ PEARL: CharacterInfo = {
     "birthday": "0423",
     "emojis": ["🌦️", "🐾", "🌈", "☁️", "🌬️", "⚡", "🌸", "🧶", "🧁", "🧪", "🔭", "💤"],
     "pun_focus": "kittenish jokes and weather quips",
+    "puns": [
+        "It's a purr-fectly good day to keep an eye on the sky!",
+        "Fur-casting is my favorite job, right after napping!",
+        "Meow-teorology never sleeps... well, except for my naps!",
+        "Stay paw-sitive, whatever the clouds are up to!",
+        "I'd call that a mew-derate outlook!",
+    ],
 }
 
 
-def get_system_prompt(character: CharacterInfo) -> str:
+def is_compact_prompt_mode(compact: bool | None = None) -> bool:
+    """Whether to use the compact prompt variants (PROMPT_MODE=compact unless overridden)."""
+    if compact is not None:
+        return compact
+    return os.environ.get("PROMPT_MODE", "full").lower() == "compact"
+
+
+def get_system_prompt(character: CharacterInfo, compact: bool | None = None) -> str:
     """
     Build a layered system prompt for a given feline persona.
     Includes appearance, persona traits, emoji strategy, and a self-check step.
     """
+    if is_compact_prompt_mode(compact):
+        return (
+            f"You are {character['full_name']}, {character['description']}.\n"
+            f"Appearance: {character['appearance']}. Persona: {character['persona_traits']}.\n"
+            f"Voice: warm, clever, never pompous; sprinkle {character['pun_focus']}; "
+            f"use emojis with flair where they add delight, especially "
+            f"{' '.join(character['emojis'])}\n"
+            "Silently self-check before sending: facts accurate, tone in persona, "
+            "persona name used once at top."
+        )
+
     return (
         f"You are {character['full_name']}, {character['description']}.\n"
         f"Appearance: {character['appearance']}\n"
@@ -110,9 +144,9 @@ NATIONAL_DAYS_PROMPT = (
 WEATHER_PROMPT = (
     "Provide a charming weather report as {full_name}:\n"
     "Current:\n"
-    "- Temp: {current[temp]}°F (feels like {current[feels_like]}°F)\n"
+    "- Temp: {current[temp]}°F{feels_like_info}\n"
     "- {current[description]}\n"
-    "- Wind: {current[wind_speed]}mph (gusts {current[wind_gust]}mph)\n"
+    "- Wind: {current[wind_speed]}mph{gust_info}\n"
     "- Humidity: {current[humidity]}%\n"
     "\nForecast Today:\n"
     "- High: {today[high]}°F, Low: {today[low]}°F\n"
@@ -131,3 +165,96 @@ WEATHER_PROMPT = (
     "5. End with a practical tip and feline pun\n"
     "\nKeep under 1000 characters. Use emojis when they add character or clarity."
 )
+
+
+# Compact prompt variants: same format fields as the prompts above, fewer input tokens
+COMPACT_OWN_BIRTHDAY_PROMPT = (
+    "It's your birthday! As {full_name}, write a festive self-celebration: upbeat greeting, "
+    "a favorite pastime with a pun, a quirky feline birthday wish, warm signed sign-off. "
+    "Under 500 characters; emojis only where they charm."
+)
+
+COMPACT_OTHER_BIRTHDAY_PROMPT = (
+    "It's {name}'s birthday! As {full_name}, write a personalized message: sunny greeting, "
+    "a fun trait of {name} with a feline twist, a sincere wish with a cat pun, uplifting "
+    "signed farewell. Under 500 characters; sparing emojis."
+)
+
+COMPACT_THANK_YOU_PROMPT = (
+    "As {full_name}, thank everyone for the birthday wishes: shout-out to your sibling cat "
+    "and family, heartfelt thanks with a feline twist, a cheeky note on feeling lucky, "
+    "affectionate signed sign-off. Under 500 characters; optional emojis."
+)
+
+COMPACT_NATIONAL_DAYS_PROMPT = (
+    "Today's national observances:\n"
+    "{days_text}\n"
+    "As {full_name}, write a lively update: bright greeting; per day an emoji bullet, "
+    "a witty cat pun and one fun fact; close with a playful question. "
+    "Under 1000 characters; whimsical, not overwhelming, emojis."
+)
+
+COMPACT_WEATHER_PROMPT = (
+    "Weather report as {full_name}.\n"
+    "Now: {current[temp]}°F{feels_like_info}, {current[description]}, "
+    "wind {current[wind_speed]}mph{gust_info}, "
+    "humidity {current[humidity]}%\n"
+    "Today: high {today[high]}°F, low {today[low]}°F, {today[description]}, "
+    "{today[pop]}% precipitation{rain_info}{snow_info}\n"
+    "Next days:\n"
+    "{upcoming_forecast}\n"
+    "Sunrise {sunrise:%I:%M %p}, sunset {sunset:%I:%M %p}, moon {moon_phase:.0%} full\n"
+    "Write: cat-themed greeting, current conditions with charm, key changes, brief outlook, "
+    "practical tip with a feline pun. Under 1000 characters; emojis where they add character."
+)
+
+
+class PromptTemplates(TypedDict):
+    own_birthday: str
+    other_birthday: str
+    thank_you: str
+    national_days: str
+    weather: str
+
+
+FULL_PROMPT_TEMPLATES = PromptTemplates(
+    own_birthday=OWN_BIRTHDAY_PROMPT,
+    other_birthday=OTHER_BIRTHDAY_PROMPT,
+    thank_you=THANK_YOU_PROMPT,
+    national_days=NATIONAL_DAYS_PROMPT,
+    weather=WEATHER_PROMPT,
+)
+
+COMPACT_PROMPT_TEMPLATES = PromptTemplates(
+    own_birthday=COMPACT_OWN_BIRTHDAY_PROMPT,
+    other_birthday=COMPACT_OTHER_BIRTHDAY_PROMPT,
+    thank_you=COMPACT_THANK_YOU_PROMPT,
+    national_days=COMPACT_NATIONAL_DAYS_PROMPT,
+    weather=COMPACT_WEATHER_PROMPT,
+)
+
+
+def get_prompt_templates(compact: bool | None = None) -> PromptTemplates:
+    """Get the user prompt templates for the current prompt mode."""
+    if is_compact_prompt_mode(compact):
+        return COMPACT_PROMPT_TEMPLATES
+    return FULL_PROMPT_TEMPLATES
+
+
+# Fallback templates, rendered locally when Claude can't generate a message in time
+FALLBACK_NATIONAL_DAYS_TEMPLATE = (
+    "{emoji} Good morning, dear friends! {full_name} here with today's observances:\n"
+    "{days_text}\n"
+    "{pun}\n"
+    "Which one will you be celebrating today? {closing_emoji}"
+)
+
+FALLBACK_WEATHER_TEMPLATE = (
+    "{emoji} Good morning from {full_name}! Here's the weather for {location}:\n"
+    "Right now it's {current_temp}°F{feels_like} with {current_description}.\n"
+    "Today: high {high}°F, low {low}°F, {today_description}{precipitation}.\n"
+    "Sunrise {sunrise:%I:%M %p}, sunset {sunset:%I:%M %p}.\n"
+    "Next days:\n"
+    "{upcoming_forecast}\n"
+    "{pun} {closing_emoji}"
+)
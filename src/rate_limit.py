@@ -0,0 +1,237 @@
+"""
+Client-side rate limiting of Anthropic requests.
+
+The limiter is per process: threads in one process (the daemon, the load generator's
+workers, a Lambda invocation's threads) share it, but concurrent Lambda invocations
+each have their own and don't see each other's usage. Across invocations, the
+anthropic-ratelimit-* response headers are what keep each limiter in step with the
+account's real budget.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections.abc import Mapping
+from dataclasses import asdict, dataclass
+from functools import cache
+from typing import Any
+
+from src.deadline import Deadline, DeadlineExceeded
+
+logger = logging.getLogger(__name__)
+
+# Defaults for the account's limits; override with ANTHROPIC_RPM, ANTHROPIC_ITPM and
+# ANTHROPIC_OTPM. Response headers correct them as soon as the first call returns.
+DEFAULT_REQUESTS_PER_MINUTE = 50
+DEFAULT_INPUT_TOKENS_PER_MINUTE = 50_000
+DEFAULT_OUTPUT_TOKENS_PER_MINUTE = 10_000
+
+RATE_LIMIT_HEADER_PREFIX = "anthropic-ratelimit-"
+DEFAULT_RETRY_AFTER_SECONDS = 1.0  # Hold-off after a 429 without a retry-after header
+
+
+class TokenBucket:
+    """A token bucket that refills continuously up to its capacity every minute."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = per_minute
+        self.tokens = per_minute
+        self.updated_at = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.capacity / 60)
+        self.updated_at = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until the bucket holds amount tokens, or is full if amount exceeds capacity."""
+        self._refill()
+        missing = min(amount, self.capacity) - self.tokens
+        return max(missing, 0) * 60 / self.capacity
+
+    def consume(self, amount: float) -> None:
+        self._refill()
+        self.tokens -= amount
+
+    def refund(self, amount: float) -> None:
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+    def sync(self, limit: float | None, remaining: float | None) -> None:
+        """Align the bucket with the limit and remaining budget the API reported."""
+        self._refill()
+        if limit:
+            self.capacity = limit
+        if remaining is not None:
+            self.tokens = min(remaining, self.capacity)
+
+
+@dataclass
+class RateLimitMetrics:
+    admitted: int = 0
+    waited: int = 0
+    total_wait_seconds: float = 0.0
+    max_wait_seconds: float = 0.0
+    rejected: int = 0  # Calls that couldn't be admitted within the deadline
+    throttled: int = 0  # 429 responses despite the limiter
+
+
+class AnthropicRateLimiter:
+    """
+    Client-side limiter for Anthropic requests, shared by every thread in the process.
+
+    Calls are admitted against request, input token and output token buckets before
+    they're sent, so they wait locally instead of being rejected with a 429. Input
+    tokens are estimated from the prompt and output tokens reserved at max_tokens;
+    response headers and usage then correct the buckets.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float,
+        input_tokens_per_minute: float,
+        output_tokens_per_minute: float,
+    ):
+        self.lock = threading.Lock()
+        self.buckets = {
+            "requests": TokenBucket(requests_per_minute),
+            "input-tokens": TokenBucket(input_tokens_per_minute),
+            "output-tokens": TokenBucket(output_tokens_per_minute),
+        }
+        self.retry_at = 0.0  # No call is admitted before this, after a 429
+        self.metrics = RateLimitMetrics()
+
+    def acquire(self, input_tokens: int, output_tokens: int, deadline: Deadline) -> None:
+        """
+        Block until a call with the given token estimates is admitted.
+
+        Raises:
+            DeadlineExceeded: If the call can't be admitted before the deadline
+        """
+        amounts = {"requests": 1, "input-tokens": input_tokens, "output-tokens": output_tokens}
+        waited = 0.0
+        while True:
+            with self.lock:
+                wait = max(
+                    self.retry_at - time.monotonic(),
+                    *(bucket.wait_time(amounts[name]) for name, bucket in self.buckets.items()),
+                )
+                if wait <= 0:
+                    for name, bucket in self.buckets.items():
+                        bucket.consume(amounts[name])
+                    self._record_admission(waited)
+                    return
+                if not deadline.has_budget(wait):
+                    self.metrics.rejected += 1
+                    raise DeadlineExceeded(
+                        f"Anthropic rate limit needs a {wait:.1f}s wait, beyond the deadline"
+                    )
+            time.sleep(wait)
+            waited += wait
+
+    def _record_admission(self, waited: float) -> None:
+        self.metrics.admitted += 1
+        if waited > 0:
+            self.metrics.waited += 1
+            self.metrics.total_wait_seconds += waited
+            self.metrics.max_wait_seconds = max(self.metrics.max_wait_seconds, waited)
+            logger.info("⏳ Waited %.2fs for Anthropic rate limit", waited)
+
+    def update_from_headers(self, headers: Mapping[str, str]) -> None:
+        """Sync the buckets with the anthropic-ratelimit-* response headers."""
+        with self.lock:
+            for name, bucket in self.buckets.items():
+                limit = headers.get(f"{RATE_LIMIT_HEADER_PREFIX}{name}-limit")
+                remaining = headers.get(f"{RATE_LIMIT_HEADER_PREFIX}{name}-remaining")
+                try:
+                    bucket.sync(
+                        float(limit) if limit else None,
+                        float(remaining) if remaining else None,
+                    )
+                except ValueError:
+                    logger.warning("⚠️ Invalid rate limit headers for %s", name)
+
+    def record_usage(
+        self,
+        estimated_input_tokens: int,
+        reserved_output_tokens: int,
+        input_tokens: int,
+        output_tokens: int,
+    ) -> None:
+        """
+        Correct the token buckets once the actual usage of a call is known. Call this
+        before update_from_headers, which then overrides the buckets the API reported on.
+        """
+        with self.lock:
+            self.buckets["input-tokens"].refund(estimated_input_tokens - input_tokens)
+            self.buckets["output-tokens"].refund(reserved_output_tokens - output_tokens)
+
+    def release(self, input_tokens: int, output_tokens: int) -> None:
+        """
+        Return everything acquired for a call that failed, its request slot included, so
+        a retry acquires it again. A failed call may still have counted against the
+        account's request limit; after a 429, record_throttled syncs the buckets with
+        what the API reported, and any other response's headers correct them later.
+        """
+        with self.lock:
+            self.buckets["requests"].refund(1)
+            self.buckets["input-tokens"].refund(input_tokens)
+            self.buckets["output-tokens"].refund(output_tokens)
+
+    def record_throttled(self, headers: Mapping[str, str]) -> None:
+        """
+        Record a 429 response: sync with its headers, and admit no call until its
+        retry-after has passed. Call this after releasing the throttled call.
+        """
+        retry_after = parse_retry_after(headers)
+        with self.lock:
+            self.metrics.throttled += 1
+            self.retry_at = max(
+                self.retry_at,
+                time.monotonic()
+                + (DEFAULT_RETRY_AFTER_SECONDS if retry_after is None else retry_after),
+            )
+        self.update_from_headers(headers)
+
+    def snapshot(self) -> dict[str, Any]:
+        """Current wait-time metrics and how full each bucket is."""
+        with self.lock:
+            for bucket in self.buckets.values():
+                bucket._refill()
+            return {
+                **asdict(self.metrics),
+                "avg_wait_seconds": (
+                    self.metrics.total_wait_seconds / self.metrics.waited
+                    if self.metrics.waited
+                    else 0.0
+                ),
+                "utilization": {
+                    name: round(1 - bucket.tokens / bucket.capacity, 3)
+                    for name, bucket in self.buckets.items()
+                },
+            }
+
+
+def parse_retry_after(headers: Mapping[str, str]) -> float | None:
+    """Seconds to wait from a retry-after-ms or retry-after header, or None if neither is valid."""
+    for name, scale in (("retry-after-ms", 1000), ("retry-after", 1)):
+        try:
+            return max(float(headers[name]) / scale, 0.0)
+        except (KeyError, TypeError, ValueError):
+            continue
+    return None
+
+
+@cache
+def get_rate_limiter() -> AnthropicRateLimiter:
+    """Get the process-wide Anthropic rate limiter."""
+    return AnthropicRateLimiter(
+        requests_per_minute=float(os.environ.get("ANTHROPIC_RPM", DEFAULT_REQUESTS_PER_MINUTE)),
+        input_tokens_per_minute=float(
+            os.environ.get("ANTHROPIC_ITPM", DEFAULT_INPUT_TOKENS_PER_MINUTE)
+        ),
+        output_tokens_per_minute=float(
+            os.environ.get("ANTHROPIC_OTPM", DEFAULT_OUTPUT_TOKENS_PER_MINUTE)
+        ),
+    )
@@ -1,18 +1,14 @@
 import logging
-from datetime import datetime
+from datetime import date, datetime
 from typing import TypedDict
 
 import anthropic
 
 from src.ai import CharacterInfo, generate_message_with_claude
+from src.archive import get_archive
 from src.config import Config
-from src.prompts import (
-    FELIX,
-    OTHER_BIRTHDAY_PROMPT,
-    OWN_BIRTHDAY_PROMPT,
-    PEARL,
-    THANK_YOU_PROMPT,
-)
+from src.deadline import Deadline
+from src.prompts import FELIX, PEARL, get_prompt_templates
 
 logger = logging.getLogger(__name__)
 
@@ -24,38 +20,78 @@ class BirthdayInfo(TypedDict):
     date: str
 
 
-def check_birthdays(config: Config, test_date: str | None = None) -> list[BirthdayInfo]:
+def check_birthdays(
+    config: Config, test_date: str | None = None, run_date: date | None = None
+) -> list[BirthdayInfo]:
     """
     Check if today is anyone's birthday.
 
     Args:
         test_date: Optional date string in MM-DD format for testing
+        run_date: The tenant's local date; defaults to the host's current date
 
     Returns:
         List of BirthdayInfo objects for today's birthdays
     """
     try:
-        date_str = test_date or datetime.now().strftime("%m%d")
+        date_str = test_date or (run_date or datetime.now()).strftime("%m%d")
 
-        logger.info(f"📅 Checking birthdays for date: {date_str}")
+        logger.info("📅 Checking birthdays for date: %s", date_str)
 
         if date_str in config.birthdays_config:
-            logger.info(f"🎂 Found birthday for {config.birthdays_config[date_str]}")
+            logger.info("🎂 Found birthday for %s", config.birthdays_config[date_str])
             return [{"name": config.birthdays_config[date_str], "date": date_str}]
         return []
     except ValueError as e:
-        logger.error(f"❌ Invalid date format in check_birthdays: {e!s}")
+        logger.error("❌ Invalid date format in check_birthdays: %s", e)
         return []
     except KeyError as e:
-        logger.error(f"❌ Error accessing birthdays config: {e!s}")
+        logger.error("❌ Error accessing birthdays config: %s", e)
         return []
     except Exception as e:
-        logger.error(f"❌ Unexpected error in check_birthdays: {e!s}")
+        logger.error("❌ Unexpected error in check_birthdays: %s", e)
         return []
 
 
+def build_birthday_prompt(
+    birthday_info: BirthdayInfo,
+    character: CharacterInfo,
+    compact: bool | None = None,
+    history: str = "",
+) -> str:
+    """
+    Build a birthday prompt, for the character's own birthday or someone else's,
+    followed by the character's recent message history.
+    """
+    templates = get_prompt_templates(compact)
+    name = birthday_info["name"]
+    is_own_birthday = name == character["name"]
+
+    if is_own_birthday:
+        prompt = templates["own_birthday"].format(
+            full_name=character["full_name"], description=character["description"]
+        )
+    else:
+        prompt = templates["other_birthday"].format(
+            full_name=character["full_name"],
+            description=character["description"],
+            name=name,
+        )
+    return prompt + history
+
+
+def build_thank_you_prompt(
+    character: CharacterInfo, compact: bool | None = None, history: str = ""
+) -> str:
+    """Build a thank-you prompt for the birthday wishes, with the recent message history."""
+    prompt = get_prompt_templates(compact)["thank_you"].format(
+        full_name=character["full_name"], description=character["description"]
+    )
+    return prompt + history
+
+
 def generate_birthday_message(
-    config: Config, birthday_info: BirthdayInfo, character: CharacterInfo
+    config: Config, birthday_info: BirthdayInfo, character: CharacterInfo, deadline: Deadline
 ) -> str:
     """
     Generate a birthday message using Claude.
@@ -63,41 +99,31 @@ def generate_birthday_message(
     Args:
         birthday_info: Information about the birthday
         character: Character information for message generation
+        deadline: Invocation deadline bounding the Claude request
 
     Returns:
         Generated birthday message or empty string if there's an error
     """
     try:
         name = birthday_info["name"]
-        is_own_birthday = name == character["name"]
-
-        if is_own_birthday:
-            prompt = OWN_BIRTHDAY_PROMPT.format(
-                full_name=character["full_name"], description=character["description"]
-            )
-        else:
-            prompt = OTHER_BIRTHDAY_PROMPT.format(
-                full_name=character["full_name"],
-                description=character["description"],
-                name=name,
-            )
-
-        message = generate_message_with_claude(config, prompt, character)
-        logger.info(f"🎁 Generated birthday message for {name}")
+        history = get_archive().recent_history(config.tenant_id, character["name"])
+        prompt = build_birthday_prompt(birthday_info, character, history=history)
+        message = generate_message_with_claude(config, prompt, character, deadline)
+        logger.info("🎁 Generated birthday message for %s", name)
         return message
     except KeyError as e:
-        logger.error(f"❌ Missing required field in birthday_info or character: {e!s}")
+        logger.error("❌ Missing required field in birthday_info or character: %s", e)
         return ""
     except anthropic.APIError as e:
-        logger.error(f"❌ Claude API error generating birthday message: {e!s}")
+        logger.error("❌ Claude API error generating birthday message: %s", e)
         return ""
     except Exception as e:
-        logger.error(f"❌ Unexpected error generating birthday message: {e!s}")
+        logger.error("❌ Unexpected error generating birthday message: %s", e)
         return ""
 
 
 def generate_thank_you_message(
-    config: Config, birthday_info: BirthdayInfo, character: CharacterInfo
+    config: Config, birthday_info: BirthdayInfo, character: CharacterInfo, deadline: Deadline
 ) -> str:
     """
     Generate a thank you message for birthday wishes.
@@ -105,45 +131,53 @@ def generate_thank_you_message(
     Args:
         birthday_info: Information about the birthday
         character: Character information for message generation
+        deadline: Invocation deadline bounding the Claude request
 
     Returns:
         Generated thank you message or empty string if there's an error
     """
     try:
-        prompt = THANK_YOU_PROMPT.format(
-            full_name=character["full_name"], description=character["description"]
-        )
+        history = get_archive().recent_history(config.tenant_id, character["name"])
+        prompt = build_thank_you_prompt(character, history=history)
 
-        message = generate_message_with_claude(config, prompt, character)
-        logger.info(f"🎁 Generated thank you message for {character['name']}")
+        message = generate_message_with_claude(config, prompt, character, deadline)
+        logger.info("🎁 Generated thank you message for %s", character["name"])
         return message
     except KeyError as e:
-        logger.error(f"❌ Missing required field in character info: {e!s}")
+        logger.error("❌ Missing required field in character info: %s", e)
         return ""
     except anthropic.APIError as e:
-        logger.error(f"❌ Claude API error generating thank you message: {e!s}")
+        logger.error("❌ Claude API error generating thank you message: %s", e)
         return ""
     except Exception as e:
-        logger.error(f"❌ Unexpected error generating thank you message: {e!s}")
+        logger.error("❌ Unexpected error generating thank you message: %s", e)
         return ""
 
 
 # Wrapper functions for Felix and Pearl
-def generate_felix_birthday_message(config: Config, birthday_info: BirthdayInfo) -> str:
+def generate_felix_birthday_message(
+    config: Config, birthday_info: BirthdayInfo, deadline: Deadline
+) -> str:
     """Generate a birthday message from Felix's perspective."""
-    return generate_birthday_message(config, birthday_info, FELIX)
+    return generate_birthday_message(config, birthday_info, FELIX, deadline)
 
 
-def generate_pearl_birthday_message(config: Config, birthday_info: BirthdayInfo) -> str:
+def generate_pearl_birthday_message(
+    config: Config, birthday_info: BirthdayInfo, deadline: Deadline
+) -> str:
     """Generate a birthday message from Pearl's perspective."""
-    return generate_birthday_message(config, birthday_info, PEARL)
+    return generate_birthday_message(config, birthday_info, PEARL, deadline)
 
 
-def generate_felix_thank_you_message(config: Config, birthday_info: BirthdayInfo) -> str:
+def generate_felix_thank_you_message(
+    config: Config, birthday_info: BirthdayInfo, deadline: Deadline
+) -> str:
     """Generate a thank you message from Felix's perspective."""
-    return generate_thank_you_message(config, birthday_info, FELIX)
+    return generate_thank_you_message(config, birthday_info, FELIX, deadline)
 
 
-def generate_pearl_thank_you_message(config: Config, birthday_info: BirthdayInfo) -> str:
+def generate_pearl_thank_you_message(
+    config: Config, birthday_info: BirthdayInfo, deadline: Deadline
+) -> str:
     """Generate a thank you message from Pearl's perspective."""
-    return generate_thank_you_message(config, birthday_info, PEARL)
+    return generate_thank_you_message(config, birthday_info, PEARL, deadline)
@@ -1,17 +1,69 @@
 import logging
-from datetime import datetime
+import os
+import re
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from datetime import date, datetime
+from typing import TypedDict
 
 import pytz
 import requests
 from bs4 import BeautifulSoup
 
+from src.circuit_breaker import CircuitOpenError, get_circuit_breaker, is_upstream_failure
+from src.deadline import Deadline
+from src.http import get_session
+from src.log_setup import submit_in_context
+from src.store import get_store
+
 logger = logging.getLogger(__name__)
 
+NATIONAL_DAYS_TIMEOUT_SECONDS = 10
+# Override with NATIONAL_DAYS_BASE_URL, e.g. to point at a local fake in load tests
+DEFAULT_NATIONAL_DAYS_BASE_URL = "https://www.nationaldaycalendar.com"
+
+# Detail page enrichment
+ENRICHMENT_MAX_WORKERS = 8
+ENRICHMENT_TIME_CAP_SECONDS = 4  # Enrichment never holds up the post for longer than this
+ENRICHMENT_TIMEOUT_SECONDS = 3
+ENRICHMENT_CACHE_TTL_SECONDS = 366 * 24 * 60 * 60
+SNIPPET_MAX_CHARS = 200
+MIN_PARAGRAPH_CHARS = 40
+
+OCCURRENCE_PATTERN = re.compile(
+    r"[^.]*\b(?:observed|celebrated|recognized)\b[^.]*\bon\b[^.]*\.", re.IGNORECASE
+)
+
+REQUEST_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36"
+    ),
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.9",
+}
+
+
+class NationalDayDetails(TypedDict):
+    """Details extracted from a national day's page."""
+
+    occurrence_text: str | None
+    summary: str | None
+    history: str | None
+
 
 class NationalDay:
-    """Represents a national day with its name, URL, and optional occurrence text."""
+    """Represents a national day with its name, URL, and optional details from its page."""
+
+    __slots__ = ("history", "name", "occurrence_text", "summary", "url")
 
-    def __init__(self, name: str, url: str, occurrence_text: str | None = None):
+    def __init__(
+        self,
+        name: str,
+        url: str,
+        occurrence_text: str | None = None,
+        summary: str | None = None,
+        history: str | None = None,
+    ):
         """
         Initialize a NationalDay instance.
 
@@ -19,50 +71,61 @@ class NationalDay:
             name: Name of the national day
             url: URL to the national day's page
             occurrence_text: Optional text describing when the day occurs
+            summary: Optional short summary of the day
+            history: Optional snippet about the day's history
         """
         self.name = name
         self.url = url
         self.occurrence_text = occurrence_text
+        self.summary = summary
+        self.history = history
 
 
-def get_national_days() -> tuple[list[NationalDay], str | None]:
+def get_national_days(
+    deadline: Deadline, run_date: date | None = None
+) -> tuple[list[NationalDay], str | None]:
     """
     Scrapes national days from nationaldaycalendar.com.
 
+    Args:
+        deadline: Invocation deadline bounding the request timeout
+        run_date: The tenant's local date to fetch; defaults to today in Eastern Time
+
     Returns:
         Tuple containing:
         - List of NationalDay objects for today's national days
         - Error message if any, otherwise None
     """
-    # Get current date in Eastern Time
-    eastern = pytz.timezone("America/New_York")
-    now = datetime.now(eastern)
-    month = now.strftime("%B").lower()
-    day = now.day
+    # Default to the current date in Eastern Time
+    if run_date is None:
+        run_date = datetime.now(pytz.timezone("America/New_York")).date()
+    month = run_date.strftime("%B").lower()
+    day = run_date.day
 
     # Construct URL
-    url = f"https://www.nationaldaycalendar.com/{month}/{month}-{day}"
-    logger.info(f"📅 Fetching national days from: {url}")
-
-    # Make request with proper headers
-    headers = {
-        "User-Agent": (
-            "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
-            "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36"
-        ),
-        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
-        "Accept-Language": "en-US,en;q=0.9",
-    }
+    base_url = os.environ.get("NATIONAL_DAYS_BASE_URL", DEFAULT_NATIONAL_DAYS_BASE_URL)
+    url = f"{base_url}/{month}/{month}-{day}"
+    logger.info("📅 Fetching national days from: %s", url)
 
+    breaker = get_circuit_breaker("nationaldaycalendar")
     try:
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
+        breaker.check()
+        timeout = deadline.timeout(NATIONAL_DAYS_TIMEOUT_SECONDS)
+        try:
+            response = get_session().get(url, headers=REQUEST_HEADERS, timeout=timeout)
+            response.raise_for_status()
+        except requests.exceptions.RequestException as e:
+            if is_upstream_failure(e, timeout < NATIONAL_DAYS_TIMEOUT_SECONDS):
+                breaker.record_failure()
+            raise
+        breaker.record_success()
+
         soup = BeautifulSoup(response.text, "html.parser")
         national_days = []
 
         # Find all national day cards
         cards = soup.select(".m-card--header a")
-        logger.info(f"📅 Found {len(cards)} total cards")
+        logger.info("📅 Found %s total cards", len(cards))
 
         for card in cards:
             name = card.text.strip()
@@ -72,15 +135,136 @@ def get_national_days() -> tuple[list[NationalDay], str | None]:
 
         return national_days, None
 
+    except CircuitOpenError as e:
+        error_msg = f"Skipped fetching national days: {e!s}"
+        logger.warning("⚠️ %s", error_msg)
+        return [], error_msg
     except requests.exceptions.RequestException as e:
         error_msg = f"Failed to fetch national days: {e!s}"
-        logger.error(f"❌ {error_msg}")
+        logger.error("❌ %s", error_msg)
         return [], error_msg
     except (AttributeError, KeyError) as e:
         error_msg = f"Error parsing national days HTML: {e!s}"
-        logger.error(f"❌ {error_msg}")
+        logger.error("❌ %s", error_msg)
         return [], error_msg
     except Exception as e:
         error_msg = f"Unexpected error processing national days: {e!s}"
-        logger.error(f"❌ {error_msg}")
+        logger.error("❌ %s", error_msg)
         return [], error_msg
+
+
+def truncate_text(text: str, max_chars: int = SNIPPET_MAX_CHARS) -> str:
+    """Truncate text to at most max_chars, preferring to cut at the end of a sentence."""
+    text = " ".join(text.split())
+    if len(text) <= max_chars:
+        return text
+
+    cut = text[:max_chars]
+    sentence_end = cut.rfind(". ")
+    if sentence_end >= max_chars // 2:
+        return cut[: sentence_end + 1]
+    return cut.rsplit(" ", 1)[0] + "…"
+
+
+def parse_national_day_details(html: str) -> NationalDayDetails:
+    """Extract the occurrence text, a short summary and a history snippet from a detail page."""
+    soup = BeautifulSoup(html, "html.parser")
+    content = soup.find("article") or soup
+    paragraphs = [
+        p.get_text(" ", strip=True)
+        for p in content.find_all("p")
+        if len(p.get_text(strip=True)) >= MIN_PARAGRAPH_CHARS
+    ]
+
+    occurrence_text = None
+    for paragraph in paragraphs:
+        if match := OCCURRENCE_PATTERN.search(paragraph):
+            occurrence_text = truncate_text(match.group(0).strip())
+            break
+
+    history = None
+    for heading in content.find_all(["h2", "h3", "h4"]):
+        if "history" not in heading.get_text().lower():
+            continue
+        paragraph = heading.find_next("p")
+        if paragraph and (text := paragraph.get_text(" ", strip=True)):
+            history = truncate_text(text)
+        break
+
+    return NationalDayDetails(
+        occurrence_text=occurrence_text,
+        summary=truncate_text(paragraphs[0]) if paragraphs else None,
+        history=history,
+    )
+
+
+def fetch_national_day_details(url: str, timeout: float) -> NationalDayDetails:
+    """Fetch and parse a national day's detail page."""
+    response = get_session().get(url, headers=REQUEST_HEADERS, timeout=timeout)
+    response.raise_for_status()
+    return parse_national_day_details(response.text)
+
+
+def enrich_national_days(national_days: list[NationalDay], deadline: Deadline) -> None:
+    """
+    Fill in details for each national day from its detail page, in place.
+
+    Details are read from the cache (by URL, for the year) or fetched concurrently with
+    a bounded pool. Both stop after ENRICHMENT_TIME_CAP_SECONDS (or when the deadline
+    runs out); days whose details haven't arrived by then are left as bare names.
+    """
+    if not national_days:
+        return
+    time_cap = min(ENRICHMENT_TIME_CAP_SECONDS, deadline.remaining())
+    if time_cap <= 0:
+        return
+
+    store = get_store()
+    year = datetime.now(pytz.timezone("America/New_York")).year
+    timeout = min(ENRICHMENT_TIMEOUT_SECONDS, time_cap)
+
+    def load_details(day: NationalDay) -> NationalDayDetails:
+        key = f"national_day_details:{year}:{day.url}"
+        try:
+            if cached := store.get(key):
+                return NationalDayDetails(**cached)
+        except Exception as e:
+            logger.error("❌ Failed to read national day details cache: %s", e)
+
+        details = fetch_national_day_details(day.url, timeout)
+        try:
+            store.put(key, dict(details), ttl_seconds=ENRICHMENT_CACHE_TTL_SECONDS)
+        except Exception as e:
+            logger.error("❌ Failed to cache national day details: %s", e)
+        return details
+
+    executor = ThreadPoolExecutor(max_workers=ENRICHMENT_MAX_WORKERS)
+    futures: dict[Future[NationalDayDetails], NationalDay] = {
+        submit_in_context(executor, load_details, day): day for day in national_days
+    }
+    done, not_done = wait(futures, timeout=time_cap)
+    # Don't wait for stragglers; their results are simply dropped
+    executor.shutdown(wait=False, cancel_futures=True)
+
+    enriched = 0
+    for future in done:
+        day = futures[future]
+        try:
+            details = future.result()
+        except Exception as e:
+            logger.warning("⚠️ Failed to enrich %s: %s", day.name, e)
+            continue
+
+        day.occurrence_text = details["occurrence_text"]
+        day.summary = details["summary"]
+        day.history = details["history"]
+        enriched += 1
+
+    logger.info(
+        "📚 Enriched %s of %s national days (%s failed, %s skipped after %.1fs)",
+        enriched,
+        len(national_days),
+        len(done) - enriched,
+        len(not_done),
+        time_cap,
+    )
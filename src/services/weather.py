@@ -1,36 +1,69 @@
 import logging
-from datetime import datetime
-from typing import TypedDict
+import math
+import os
+import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from datetime import UTC, date, datetime, timedelta
+from functools import cache
+from typing import Any, Protocol, TypedDict
 
 import pytz
-import requests
 
+from src.circuit_breaker import CircuitOpenError, get_circuit_breaker, is_upstream_failure
 from src.config import Config
+from src.deadline import Deadline, DeadlineExceeded
+from src.http import get_session
+from src.log_setup import submit_in_context
+from src.store import get_store
 
 logger = logging.getLogger(__name__)
 
 # Constants
 PRECIPITATION_CHANCE_THRESHOLD = 0.2  # Minimum probability to show rain chance in forecast
+WEATHER_TIMEOUT_SECONDS = 10
+# Override with WEATHER_API_URL, e.g. to point at a local fake in load tests
+DEFAULT_WEATHER_API_URL = "https://api.openweathermap.org/data/3.0/onecall"
+# Override with NWS_API_URL
+DEFAULT_NWS_API_URL = "https://api.weather.gov"
+# Providers in order of preference; override with WEATHER_PROVIDERS, e.g.
+# "openweathermap,nws" to fall back to NWS (US only) when OpenWeatherMap fails or is late
+DEFAULT_WEATHER_PROVIDERS = "openweathermap"
+WEATHER_HEDGE_DELAY_SECONDS = 2.0  # Wait for a provider this long before asking the next
+NWS_HEADERS = {
+    # NWS asks every client to identify itself
+    "User-Agent": "felix-and-pearl-bots (https://github.com/tlent/felix-and-pearl-bots)",
+    "Accept": "application/geo+json",
+}
+NWS_POINTS_TTL_SECONDS = 30 * 24 * 60 * 60  # Gridpoint metadata rarely changes
+UPCOMING_DAYS = 5
+MIN_UPCOMING_DAYS = 3  # Fewer forecast days than this makes a response incomplete
+MIN_NWS_TODAY_HOURS = 12  # Fewer hours left than this makes NWS's "today" too partial
+PROVIDER_STATS_WINDOW = 50  # Recent latencies kept per provider
+SYNODIC_MONTH_DAYS = 29.530588853
+REFERENCE_NEW_MOON = datetime(2000, 1, 6, 18, 14, tzinfo=UTC)
 
 
+# Fields that may be None are ones a provider doesn't report; they're left out of
+# prompts and messages rather than shown as zeros
 class CurrentWeather(TypedDict):
     temp: float
-    feels_like: float
+    feels_like: float | None
     humidity: int
     wind_speed: float
-    wind_gust: float
+    wind_gust: float | None
     description: str
-    clouds: int
+    clouds: int | None
 
 
 class DailyWeather(TypedDict):
     high: float
     low: float
-    feels_like: dict[str, float]  # day, night, eve, morn
+    feels_like: dict[str, float] | None  # day, night, eve, morn
     description: str
     pop: float  # probability of precipitation
-    rain: float
-    snow: float
+    rain: float | None
+    snow: float | None
 
 
 class DailyForecast(TypedDict):
@@ -39,8 +72,8 @@ class DailyForecast(TypedDict):
     low: float
     description: str
     pop: float
-    rain: float
-    snow: float
+    rain: float | None
+    snow: float | None
 
 
 class WeatherData(TypedDict):
@@ -49,19 +82,34 @@ class WeatherData(TypedDict):
     upcoming: list[DailyForecast]
     sunrise: datetime
     sunset: datetime
-    moonrise: datetime
-    moonset: datetime
+    moonrise: datetime | None
+    moonset: datetime | None
     moon_phase: float
 
 
-def get_weather(config: Config) -> WeatherData | None:
-    """
-    Get current weather data and daily forecast from OpenWeatherMap API.
-    Returns WeatherData if successful, None if there's an error.
-    """
-    try:
-        response = requests.get(
-            "https://api.openweathermap.org/data/3.0/onecall",
+class WeatherProvider(Protocol):
+    """A weather source normalized into WeatherData."""
+
+    name: str
+
+    def fetch(self, config: Config, timeout: float) -> WeatherData:
+        """
+        Fetch the weather for the configured location.
+
+        Raises:
+            Exception: If the request fails or the response can't be parsed
+        """
+        ...
+
+
+class OpenWeatherMapProvider:
+    """OpenWeatherMap One Call 3.0, the original and most complete source."""
+
+    name = "openweathermap"
+
+    def fetch(self, config: Config, timeout: float) -> WeatherData:
+        response = get_session().get(
+            os.environ.get("WEATHER_API_URL", DEFAULT_WEATHER_API_URL),
             params={
                 "lat": config.weather_lat,
                 "lon": config.weather_lon,
@@ -69,70 +117,574 @@ def get_weather(config: Config) -> WeatherData | None:
                 "units": "imperial",
                 "exclude": "alerts,minutely,hourly",
             },
-            timeout=10,
+            timeout=timeout,
         )
         response.raise_for_status()
-        data = response.json()
-
-        # Get timezone from API response
-        tz = pytz.timezone(data["timezone"])
-
-        # Convert timestamps to datetime objects
-        current = data["current"]
-        daily = data["daily"]  # Now using full daily array
-        today = daily[0]  # First day's forecast
-
-        # Process upcoming days (next 5 days)
-        upcoming_days = []
-        for day in daily[1:6]:  # Get next 5 days
-            upcoming_days.append(
-                DailyForecast(
-                    date=datetime.fromtimestamp(day["dt"], tz=tz),
-                    high=round(day["temp"]["max"]),
-                    low=round(day["temp"]["min"]),
-                    description=day["weather"][0]["description"],
-                    pop=round(day["pop"], 1),
-                    rain=round(day.get("rain", 0.0)),
-                    snow=round(day.get("snow", 0.0)),
-                )
+        return parse_onecall(response.json())
+
+
+def parse_onecall(data: dict[str, Any]) -> WeatherData:
+    """Normalize an OpenWeatherMap One Call response into WeatherData."""
+    # Get timezone from API response
+    tz = pytz.timezone(data["timezone"])
+
+    # Convert timestamps to datetime objects
+    current = data["current"]
+    daily = data["daily"]  # Now using full daily array
+    today = daily[0]  # First day's forecast
+
+    # Process upcoming days (next 5 days)
+    upcoming_days = []
+    for day in daily[1 : UPCOMING_DAYS + 1]:
+        upcoming_days.append(
+            DailyForecast(
+                date=datetime.fromtimestamp(day["dt"], tz=tz),
+                high=round(day["temp"]["max"]),
+                low=round(day["temp"]["min"]),
+                description=day["weather"][0]["description"],
+                pop=round(day["pop"], 1),
+                rain=round(day.get("rain", 0.0)),
+                snow=round(day.get("snow", 0.0)),
             )
+        )
+
+    # Format and structure the weather data to make it engaging and on-brand with Felix and Pearl
+    return WeatherData(
+        current=CurrentWeather(
+            temp=round(current["temp"]),
+            feels_like=round(current["feels_like"]),
+            humidity=current["humidity"],
+            wind_speed=round(current["wind_speed"]),
+            # One Call leaves out gusts when it has no gust data
+            wind_gust=round(current["wind_gust"]) if "wind_gust" in current else None,
+            description=current["weather"][0]["description"],
+            clouds=current["clouds"],
+        ),
+        today=DailyWeather(
+            high=round(today["temp"]["max"]),
+            low=round(today["temp"]["min"]),
+            feels_like={
+                "day": round(today["feels_like"]["day"]),
+                "night": round(today["feels_like"]["night"]),
+                "eve": round(today["feels_like"]["eve"]),
+                "morn": round(today["feels_like"]["morn"]),
+            },
+            description=today["weather"][0]["description"],
+            pop=round(today["pop"], 1),
+            rain=round(today.get("rain", 0.0)),
+            snow=round(today.get("snow", 0.0)),
+        ),
+        upcoming=upcoming_days,
+        sunrise=datetime.fromtimestamp(current["sunrise"], tz=tz),
+        sunset=datetime.fromtimestamp(current["sunset"], tz=tz),
+        # One Call reports 0 on days the moon doesn't rise or set
+        moonrise=datetime.fromtimestamp(today["moonrise"], tz=tz) if today["moonrise"] else None,
+        moonset=datetime.fromtimestamp(today["moonset"], tz=tz) if today["moonset"] else None,
+        moon_phase=today["moon_phase"],
+    )
+
+
+class NWSProvider:
+    """
+    National Weather Service gridpoint API (US locations only, no API key).
+
+    Daily highs, lows and precipitation chances are derived from the hourly forecast,
+    so today's only cover the hours left in the day. NWS has no feels-like, gust, cloud
+    cover, precipitation amount or moonrise data, so those are left unavailable (None);
+    sunrise, sunset and the moon phase are computed locally.
+    """
+
+    name = "nws"
 
-        # Format and structure the weather data to make it engaging and on-brand with Felix and Pearl
-        return WeatherData(
-            current=CurrentWeather(
-                temp=round(current["temp"]),
-                feels_like=round(current["feels_like"]),
-                humidity=current["humidity"],
-                wind_speed=round(current["wind_speed"]),
-                wind_gust=round(current.get("wind_gust", 0.0)),
-                description=current["weather"][0]["description"],
-                clouds=current["clouds"],
-            ),
-            today=DailyWeather(
-                high=round(today["temp"]["max"]),
-                low=round(today["temp"]["min"]),
-                feels_like={
-                    "day": round(today["feels_like"]["day"]),
-                    "night": round(today["feels_like"]["night"]),
-                    "eve": round(today["feels_like"]["eve"]),
-                    "morn": round(today["feels_like"]["morn"]),
-                },
-                description=today["weather"][0]["description"],
-                pop=round(today["pop"], 1),
-                rain=round(today.get("rain", 0.0)),
-                snow=round(today.get("snow", 0.0)),
-            ),
-            upcoming=upcoming_days,
-            sunrise=datetime.fromtimestamp(current["sunrise"], tz=tz),
-            sunset=datetime.fromtimestamp(current["sunset"], tz=tz),
-            moonrise=datetime.fromtimestamp(today["moonrise"], tz=tz),
-            moonset=datetime.fromtimestamp(today["moonset"], tz=tz),
-            moon_phase=today["moon_phase"],
+    def points(self, config: Config, timeout: float) -> dict[str, Any]:
+        """Look up (and cache) the gridpoint forecast URLs and time zone for the location."""
+        store = get_store()
+        key = f"nws_points:{config.weather_lat},{config.weather_lon}"
+        try:
+            if cached := store.get(key):
+                return cached
+        except Exception as e:
+            logger.error("❌ Failed to read NWS points cache: %s", e)
+
+        base_url = os.environ.get("NWS_API_URL", DEFAULT_NWS_API_URL)
+        response = get_session().get(
+            f"{base_url}/points/{config.weather_lat},{config.weather_lon}",
+            headers=NWS_HEADERS,
+            timeout=timeout,
         )
+        response.raise_for_status()
+        properties = response.json()["properties"]
+        points = {
+            "forecast_hourly": properties["forecastHourly"],
+            "time_zone": properties["timeZone"],
+        }
+        try:
+            store.put(key, points, ttl_seconds=NWS_POINTS_TTL_SECONDS)
+        except Exception as e:
+            logger.error("❌ Failed to cache NWS points: %s", e)
+        return points
+
+    def fetch(self, config: Config, timeout: float) -> WeatherData:
+        start = time.monotonic()
+        points = self.points(config, timeout)
+        response = get_session().get(
+            points["forecast_hourly"],
+            headers=NWS_HEADERS,
+            timeout=max(timeout - (time.monotonic() - start), 0.1),
+        )
+        response.raise_for_status()
+        return parse_nws_hourly(
+            response.json()["properties"]["periods"],
+            pytz.timezone(points["time_zone"]),
+            float(config.weather_lat),
+            float(config.weather_lon),
+        )
+
+
+def parse_wind_speed(wind_speed: str) -> float:
+    """Parse an NWS wind speed like "10 mph" or "5 to 10 mph", taking the upper bound."""
+    numbers = [float(part) for part in wind_speed.split() if part.replace(".", "").isdigit()]
+    return max(numbers, default=0.0)
+
+
+def summarize_nws_day(periods: list[dict[str, Any]]) -> DailyForecast:
+    """Summarize a day's hourly NWS periods into a daily forecast."""
+    temperatures = [period["temperature"] for period in periods]
+    pops = [(period["probabilityOfPrecipitation"]["value"] or 0) / 100 for period in periods]
+    daytime = [period for period in periods if period["isDaytime"]] or periods
+    description = Counter(period["shortForecast"] for period in daytime).most_common(1)[0][0]
+    return DailyForecast(
+        date=datetime.fromisoformat(periods[0]["startTime"]),
+        high=round(max(temperatures)),
+        low=round(min(temperatures)),
+        description=description.lower(),
+        pop=round(max(pops), 1),
+        rain=None,
+        snow=None,
+    )
+
+
+def parse_nws_hourly(
+    periods: list[dict[str, Any]], tz: pytz.BaseTzInfo, lat: float, lon: float
+) -> WeatherData:
+    """
+    Normalize NWS hourly forecast periods into WeatherData.
+
+    Raises:
+        ValueError: If humidity is missing, or too few hours of today are left for a
+            meaningful daily summary
+    """
+    days: dict[date, list[dict[str, Any]]] = {}
+    for period in periods:
+        start = datetime.fromisoformat(period["startTime"]).astimezone(tz)
+        days.setdefault(start.date(), []).append(period)
+    today_periods = next(iter(days.values()))
+    if len(today_periods) < MIN_NWS_TODAY_HOURS:
+        raise ValueError(f"Only {len(today_periods)} hours of today are left in the forecast")
+    summaries = [summarize_nws_day(day_periods) for day_periods in days.values()]
+    today = summaries[0]
+    current = periods[0]
+    humidity = (current.get("relativeHumidity") or {}).get("value")
+    if humidity is None:
+        raise ValueError("Current humidity is missing")
+
+    now = datetime.fromisoformat(current["startTime"]).astimezone(tz)
+    sunrise, sunset = sun_times(lat, lon, now.date(), tz)
+    return WeatherData(
+        current=CurrentWeather(
+            temp=round(current["temperature"]),
+            feels_like=None,
+            humidity=round(humidity),
+            wind_speed=round(parse_wind_speed(current["windSpeed"])),
+            wind_gust=None,
+            description=current["shortForecast"].lower(),
+            clouds=None,
+        ),
+        today=DailyWeather(
+            high=today["high"],
+            low=today["low"],
+            feels_like=None,
+            description=today["description"],
+            pop=today["pop"],
+            rain=None,
+            snow=None,
+        ),
+        upcoming=summaries[1 : UPCOMING_DAYS + 1],
+        sunrise=sunrise,
+        sunset=sunset,
+        moonrise=None,
+        moonset=None,
+        moon_phase=calculate_moon_phase(now),
+    )
+
+
+def sun_times(lat: float, lon: float, day: date, tz: pytz.BaseTzInfo) -> tuple[datetime, datetime]:
+    """Approximate sunrise and sunset (within a minute or two) with the sunrise equation."""
+    julian_day = datetime(day.year, day.month, day.day, 12, tzinfo=UTC).timestamp() / 86400
+    n = math.floor(julian_day + 2440587.5 - 2451545.0 + 0.0008)
+    mean_solar_time = n - lon / 360
+    anomaly = math.radians((357.5291 + 0.98560028 * mean_solar_time) % 360)
+    center = (
+        1.9148 * math.sin(anomaly) + 0.02 * math.sin(2 * anomaly) + 0.0003 * math.sin(3 * anomaly)
+    )
+    longitude = math.radians((math.degrees(anomaly) + center + 180 + 102.9372) % 360)
+    transit = (
+        2451545.0 + mean_solar_time + 0.0053 * math.sin(anomaly) - 0.0069 * math.sin(2 * longitude)
+    )
+    declination = math.asin(math.sin(longitude) * math.sin(math.radians(23.4397)))
+    latitude = math.radians(lat)
+    cos_hour_angle = (
+        math.sin(math.radians(-0.833)) - math.sin(latitude) * math.sin(declination)
+    ) / (math.cos(latitude) * math.cos(declination))
+    # Clamp for polar day and night, where the sun never sets or rises
+    hour_angle = math.degrees(math.acos(min(max(cos_hour_angle, -1.0), 1.0)))
+
+    def to_datetime(julian: float) -> datetime:
+        return datetime.fromtimestamp((julian - 2440587.5) * 86400, tz=tz)
+
+    return to_datetime(transit - hour_angle / 360), to_datetime(transit + hour_angle / 360)
+
+
+def calculate_moon_phase(moment: datetime) -> float:
+    """Moon phase as OpenWeatherMap reports it: 0 new, 0.5 full, approaching 1 new again."""
+    days = (moment - REFERENCE_NEW_MOON).total_seconds() / 86400
+    return round((days / SYNODIC_MONTH_DAYS) % 1, 2)
+
+
+class StubWeatherProvider:
+    """
+    A local provider returning canned data after an optional delay, or failing.
+    Select it with WEATHER_PROVIDERS=stub, or pass instances to get_weather in tests.
+    """
+
+    def __init__(
+        self,
+        name: str = "stub",
+        weather_data: WeatherData | None = None,
+        latency_seconds: float = 0.0,
+        error: Exception | None = None,
+    ):
+        self.name = name
+        self.weather_data = weather_data
+        self.latency_seconds = latency_seconds
+        self.error = error
+
+    def fetch(self, config: Config, timeout: float) -> WeatherData:
+        time.sleep(min(self.latency_seconds, timeout))
+        if self.error:
+            raise self.error
+        if self.latency_seconds > timeout:
+            raise TimeoutError(f"{self.name} timed out")
+        return self.weather_data or stub_weather_data()
+
+
+def stub_weather_data() -> WeatherData:
+    """Plausible weather for today in New York, for local runs without an API key."""
+    tz = pytz.timezone("America/New_York")
+    today = datetime.now(tz).replace(hour=7, minute=0, second=0, microsecond=0)
+    return WeatherData(
+        current=CurrentWeather(
+            temp=58,
+            feels_like=55,
+            humidity=64,
+            wind_speed=8,
+            wind_gust=14,
+            description="scattered clouds",
+            clouds=40,
+        ),
+        today=DailyWeather(
+            high=67,
+            low=49,
+            feels_like={"day": 65, "night": 48, "eve": 60, "morn": 52},
+            description="light rain",
+            pop=0.5,
+            rain=2,
+            snow=0,
+        ),
+        upcoming=[
+            DailyForecast(
+                date=today + timedelta(days=offset),
+                high=62 + offset,
+                low=46 + offset,
+                description="partly cloudy",
+                pop=0.1,
+                rain=0,
+                snow=0,
+            )
+            for offset in range(1, UPCOMING_DAYS + 1)
+        ],
+        sunrise=today.replace(hour=6, minute=45),
+        sunset=today.replace(hour=18, minute=30),
+        moonrise=today.replace(hour=9, minute=15),
+        moonset=today.replace(hour=20, minute=5),
+        moon_phase=0.3,
+    )
+
+
+WEATHER_PROVIDERS: dict[str, type[OpenWeatherMapProvider | NWSProvider | StubWeatherProvider]] = {
+    "openweathermap": OpenWeatherMapProvider,
+    "nws": NWSProvider,
+    "stub": StubWeatherProvider,
+}
 
-    except requests.exceptions.RequestException as e:
-        logger.error(f"❌ Failed to fetch weather data: {e!s}")
+
+def get_weather_providers() -> list[WeatherProvider]:
+    """The providers named in WEATHER_PROVIDERS, in order of preference."""
+    names = os.environ.get("WEATHER_PROVIDERS", DEFAULT_WEATHER_PROVIDERS).split(",")
+    providers: list[WeatherProvider] = []
+    for name in (name.strip() for name in names):
+        if name in WEATHER_PROVIDERS:
+            providers.append(WEATHER_PROVIDERS[name]())
+        elif name:
+            logger.warning("⚠️ Unknown weather provider: %s", name)
+    return providers
+
+
+def validate_weather_data(weather_data: WeatherData) -> str | None:
+    """
+    Check that a provider's response is complete, returning the problem if it isn't.
+    Fields a provider doesn't report may be None; see unavailable_fields.
+    """
+    current, today = weather_data["current"], weather_data["today"]
+    for field in ("temp", "feels_like", "humidity", "wind_speed", "wind_gust"):
+        value = current[field]  # type: ignore[literal-required]
+        if value is None and field in ("feels_like", "wind_gust"):
+            continue
+        if not isinstance(value, int | float) or math.isnan(value):
+            return f"current {field} is missing"
+    if not current["description"] or not today["description"]:
+        return "description is missing"
+    if today["high"] < today["low"]:
+        return "today's high is below its low"
+    if len(weather_data["upcoming"]) < MIN_UPCOMING_DAYS:
+        return f"only {len(weather_data['upcoming'])} forecast days"
+    if not weather_data["sunrise"] < weather_data["sunset"]:
+        return "sunrise is not before sunset"
+    return None
+
+
+def unavailable_fields(weather_data: WeatherData) -> list[str]:
+    """The fields a provider didn't report, e.g. ["current.wind_gust", "today.rain"]."""
+    fields = [f"current.{name}" for name, value in weather_data["current"].items() if value is None]
+    fields += [f"today.{name}" for name, value in weather_data["today"].items() if value is None]
+    fields += sorted(
+        {
+            f"upcoming.{name}"
+            for day in weather_data["upcoming"]
+            for name, value in day.items()
+            if value is None
+        }
+    )
+    if weather_data["moonrise"] is None or weather_data["moonset"] is None:
+        fields.append("moon times")
+    return fields
+
+
+@cache
+def get_stats_executor() -> ThreadPoolExecutor:
+    """
+    A single background worker for the providers' breaker and stats writes, so they
+    never hold up the weather they're about. One worker also keeps them in order.
+    """
+    return ThreadPoolExecutor(max_workers=1, thread_name_prefix="weather-stats")
+
+
+def record_provider_stats(name: str, latency_ms: float | None = None, won: bool = False) -> None:
+    """
+    Update a provider's stats in the state store: attempts and successes with their
+    latency (latency_ms None for a failure), or a win in the race.
+    """
+
+    def add(stats: dict[str, Any] | None) -> dict[str, Any]:
+        stats = stats or {"attempts": 0, "successes": 0, "wins": 0, "latencies_ms": []}
+        if won:
+            stats["wins"] += 1
+        else:
+            stats["attempts"] += 1
+            if latency_ms is not None:
+                stats["successes"] += 1
+                stats["latencies_ms"] = [*stats["latencies_ms"], round(latency_ms)][
+                    -PROVIDER_STATS_WINDOW:
+                ]
+        return stats
+
+    try:
+        get_store().update(f"weather_provider_stats:{name}", add)
+    except Exception as e:
+        logger.error("❌ Failed to record weather provider stats for %s: %s", name, e)
+
+
+def record_provider_result(
+    name: str, latency_ms: float | None, upstream_failure: bool = False
+) -> None:
+    """
+    Record a provider's fetch in its stats, and in its circuit breaker if it succeeded
+    or the provider itself failed.
+
+    Args:
+        name: The provider's name
+        latency_ms: How long a successful fetch took, or None if it failed
+        upstream_failure: Whether the failure counts against the provider's shared breaker
+    """
+    breaker = get_circuit_breaker(name)
+    if latency_ms is not None:
+        breaker.record_success()
+    elif upstream_failure:
+        breaker.record_failure()
+    record_provider_stats(name, latency_ms)
+
+
+def get_provider_stats(name: str) -> dict[str, Any] | None:
+    """A provider's win rate and median latency over its recent attempts."""
+    stats = get_store().get(f"weather_provider_stats:{name}")
+    if not stats:
         return None
+    latencies = sorted(stats["latencies_ms"])
+    return {
+        **stats,
+        "win_rate": stats["wins"] / stats["attempts"] if stats["attempts"] else 0.0,
+        "success_rate": stats["successes"] / stats["attempts"] if stats["attempts"] else 0.0,
+        "p50_latency_ms": latencies[len(latencies) // 2] if latencies else None,
+    }
+
+
+def get_weather_provider_stats() -> dict[str, dict[str, Any] | None]:
+    """Stats for each configured provider, for metrics; None for a provider without any."""
+    stats: dict[str, dict[str, Any] | None] = {}
+    for provider in get_weather_providers():
+        try:
+            stats[provider.name] = get_provider_stats(provider.name)
+        except Exception as e:
+            logger.error("❌ Failed to read weather provider stats for %s: %s", provider.name, e)
+            stats[provider.name] = None
+    return stats
+
+
+def fetch_from_provider(
+    provider: WeatherProvider, config: Config, timeout: float
+) -> WeatherData | None:
+    """
+    Fetch and validate a provider's weather behind its circuit breaker. The outcome is
+    recorded in the background, after the weather is returned.
+    """
+    breaker = get_circuit_breaker(provider.name)
+    try:
+        breaker.check()
+    except CircuitOpenError as e:
+        logger.warning("⚠️ Skipped weather provider %s: %s", provider.name, e)
+        return None
+
+    start = time.perf_counter()
+    try:
+        weather_data = provider.fetch(config, timeout)
+        if problem := validate_weather_data(weather_data):
+            raise ValueError(f"Incomplete response: {problem}")
     except Exception as e:
-        logger.error(f"❌ Error processing weather data: {e!s}")
+        # A bad API key or location, an incomplete response or a timeout cut short by the
+        # deadline is this tenant's problem, not the provider's, so other tenants still try it
+        upstream_failure = is_upstream_failure(e, timeout < WEATHER_TIMEOUT_SECONDS)
+        submit_in_context(
+            get_stats_executor(), record_provider_result, provider.name, None, upstream_failure
+        )
+        logger.error("❌ Weather provider %s failed: %s", provider.name, e)
+        return None
+
+    latency_ms = (time.perf_counter() - start) * 1000
+    submit_in_context(get_stats_executor(), record_provider_result, provider.name, latency_ms)
+    logger.info("🌦️ Weather provider %s responded in %.0f ms", provider.name, latency_ms)
+    if unavailable := unavailable_fields(weather_data):
+        logger.info(
+            "🌦️ Weather provider %s doesn't report %s", provider.name, ", ".join(unavailable)
+        )
+    return weather_data
+
+
+def fetch_hedged(
+    providers: list[WeatherProvider], config: Config, timeout: float
+) -> tuple[WeatherProvider, WeatherData] | None:
+    """
+    Ask the providers in order of preference, starting the next as a hedge once the
+    ones asked so far have all failed, or haven't answered within
+    WEATHER_HEDGE_DELAY_SECONDS. The first response is held for another hedge delay
+    in case a more preferred provider still answers.
+    Returns the provider used and its weather, or None if none answered in time.
+    """
+    executor = ThreadPoolExecutor(max_workers=len(providers))
+    ranks: dict[Future[WeatherData | None], int] = {}  # Each request's provider preference
+    pending: set[Future[WeatherData | None]] = set()
+    results: dict[int, WeatherData] = {}
+    now = time.monotonic()
+    end = now + timeout
+    next_start = now  # When to ask the next provider
+    hold_until = end  # How long the first response waits for a more preferred provider
+    try:
+        while True:
+            if results:
+                best = min(results)
+                if now >= hold_until or all(ranks[future] > best for future in pending):
+                    return providers[best], results[best]
+                wake_at = hold_until
+            elif now >= end or (not pending and len(ranks) == len(providers)):
+                return None
+            elif len(ranks) < len(providers) and (now >= next_start or not pending):
+                rank = len(ranks)
+                # Hedges only get what's left of the timeout
+                provider_timeout = timeout if rank == 0 else end - now
+                future = submit_in_context(
+                    executor, fetch_from_provider, providers[rank], config, provider_timeout
+                )
+                ranks[future] = rank
+                pending.add(future)
+                next_start = now + WEATHER_HEDGE_DELAY_SECONDS
+                continue
+            else:
+                wake_at = min(next_start, end) if len(ranks) < len(providers) else end
+
+            done, pending = wait(pending, timeout=wake_at - now, return_when=FIRST_COMPLETED)
+            now = time.monotonic()
+            for future in done:
+                if weather_data := future.result():
+                    if not results:
+                        hold_until = min(now + WEATHER_HEDGE_DELAY_SECONDS, end)
+                    results[ranks[future]] = weather_data
+    finally:
+        # Slower providers finish in the background and only update their stats
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def get_weather(
+    config: Config, deadline: Deadline, providers: list[WeatherProvider] | None = None
+) -> WeatherData | None:
+    """
+    Get current weather data and daily forecast, preferring the first provider and
+    falling back to the others when it fails or is late (see fetch_hedged).
+    Returns WeatherData if successful, None if every provider failed.
+
+    Args:
+        config: Config with the weather location and API key
+        deadline: Invocation deadline bounding the requests
+        providers: Providers to ask; defaults to those named in WEATHER_PROVIDERS
+    """
+    providers = providers if providers is not None else get_weather_providers()
+    if not providers:
+        logger.error("❌ No weather providers configured")
         return None
+
+    try:
+        timeout = deadline.timeout(WEATHER_TIMEOUT_SECONDS)
+    except DeadlineExceeded as e:
+        logger.error("❌ Skipped fetching weather: %s", e)
+        return None
+
+    start = time.monotonic()
+    if result := fetch_hedged(providers, config, timeout):
+        winner, weather_data = result
+        submit_in_context(get_stats_executor(), record_provider_stats, winner.name, None, True)
+        logger.info("🏆 Using weather from %s", winner.name)
+        return weather_data
+
+    if time.monotonic() - start >= timeout:
+        logger.error("❌ No weather provider responded within %.1fs", timeout)
+    else:
+        logger.error("❌ Failed to fetch weather data from any provider")
+    return None
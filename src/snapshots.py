@@ -0,0 +1,356 @@
+"""
+Immutable snapshots of stage outputs with a compact, versioned JSON codec.
+
+WeatherData (nested TypedDicts holding tz-aware datetimes) and NationalDay are
+converted to frozen, slotted dataclasses and encoded as positional JSON arrays:
+
+    [version, kind, row]
+
+Datetimes are stored as exact microseconds since the epoch plus their time zone
+(pytz or zoneinfo name, or UTC offset), so they decode to the same instant, offset
+and zone, including across DST changes. Payloads from another codec version raise
+SnapshotError, which callers treat like a cache miss.
+"""
+
+import json
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta, timezone, tzinfo
+from typing import Any
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+import pytz
+
+from src.services.national_days import NationalDay
+from src.services.weather import CurrentWeather, DailyForecast, DailyWeather, WeatherData
+
+SNAPSHOT_VERSION = 2  # 2: fields a provider doesn't report are null
+WEATHER_KIND = "weather"
+NATIONAL_DAYS_KIND = "national_days"
+
+EPOCH = datetime(1970, 1, 1, tzinfo=UTC)
+FEELS_LIKE_KEYS = ("day", "night", "eve", "morn")
+
+
+class SnapshotError(ValueError):
+    """Raised when a payload can't be decoded by this version of the codec."""
+
+
+def encode_datetime(value: datetime) -> list[Any]:
+    """
+    Encode a tz-aware datetime as [microseconds since the epoch, pytz zone name],
+    [..., zoneinfo key, 1] or [..., UTC offset in seconds] for fixed-offset zones.
+    """
+    if value.tzinfo is None:
+        raise SnapshotError("Snapshots only hold tz-aware datetimes")
+    micros = (value - EPOCH) // timedelta(microseconds=1)
+    if isinstance(value.tzinfo, ZoneInfo):
+        return [micros, value.tzinfo.key, 1]
+    if zone := getattr(value.tzinfo, "zone", None):
+        return [micros, zone]
+    offset = value.utcoffset() or timedelta()
+    return [micros, int(offset.total_seconds())]
+
+
+def decode_datetime(row: list[Any]) -> datetime:
+    """Decode a datetime encoded by encode_datetime, in the same kind of time zone."""
+    micros, zone, *flags = row
+    tz: tzinfo
+    if isinstance(zone, int):
+        tz = timezone(timedelta(seconds=zone))
+    elif flags:
+        tz = ZoneInfo(zone)
+    else:
+        tz = pytz.timezone(zone)
+    return (EPOCH + timedelta(microseconds=micros)).astimezone(tz)
+
+
+@dataclass(frozen=True, slots=True)
+class CurrentWeatherSnapshot:
+    temp: float
+    feels_like: float | None
+    humidity: int
+    wind_speed: float
+    wind_gust: float | None
+    description: str
+    clouds: int | None
+
+    @classmethod
+    def from_current(cls, current: CurrentWeather) -> "CurrentWeatherSnapshot":
+        return cls(**current)
+
+    def to_current(self) -> CurrentWeather:
+        return CurrentWeather(
+            temp=self.temp,
+            feels_like=self.feels_like,
+            humidity=self.humidity,
+            wind_speed=self.wind_speed,
+            wind_gust=self.wind_gust,
+            description=self.description,
+            clouds=self.clouds,
+        )
+
+    def to_row(self) -> list[Any]:
+        return [
+            self.temp,
+            self.feels_like,
+            self.humidity,
+            self.wind_speed,
+            self.wind_gust,
+            self.description,
+            self.clouds,
+        ]
+
+    @classmethod
+    def from_row(cls, row: list[Any]) -> "CurrentWeatherSnapshot":
+        return cls(*row)
+
+
+@dataclass(frozen=True, slots=True)
+class DailyWeatherSnapshot:
+    high: float
+    low: float
+    feels_like: tuple[tuple[str, float], ...] | None  # (period, temperature) pairs
+    description: str
+    pop: float
+    rain: float | None
+    snow: float | None
+
+    @classmethod
+    def from_daily(cls, today: DailyWeather) -> "DailyWeatherSnapshot":
+        return cls(
+            high=today["high"],
+            low=today["low"],
+            feels_like=tuple(today["feels_like"].items()) if today["feels_like"] else None,
+            description=today["description"],
+            pop=today["pop"],
+            rain=today["rain"],
+            snow=today["snow"],
+        )
+
+    def to_daily(self) -> DailyWeather:
+        return DailyWeather(
+            high=self.high,
+            low=self.low,
+            feels_like=dict(self.feels_like) if self.feels_like is not None else None,
+            description=self.description,
+            pop=self.pop,
+            rain=self.rain,
+            snow=self.snow,
+        )
+
+    def to_row(self) -> list[Any]:
+        # The usual periods are stored positionally; any others keep their names
+        feels_like = dict(self.feels_like) if self.feels_like is not None else None
+        feels_like_row: list[Any] | dict[str, float] | None = feels_like
+        if feels_like and list(feels_like) == list(FEELS_LIKE_KEYS):
+            feels_like_row = list(feels_like.values())
+        return [
+            self.high,
+            self.low,
+            feels_like_row,
+            self.description,
+            self.pop,
+            self.rain,
+            self.snow,
+        ]
+
+    @classmethod
+    def from_row(cls, row: list[Any]) -> "DailyWeatherSnapshot":
+        high, low, feels_like, description, pop, rain, snow = row
+        if isinstance(feels_like, list):
+            feels_like = dict(zip(FEELS_LIKE_KEYS, feels_like, strict=True))
+        feels_like_pairs = tuple(feels_like.items()) if feels_like is not None else None
+        return cls(high, low, feels_like_pairs, description, pop, rain, snow)
+
+
+@dataclass(frozen=True, slots=True)
+class ForecastSnapshot:
+    date: datetime
+    high: float
+    low: float
+    description: str
+    pop: float
+    rain: float | None
+    snow: float | None
+
+    @classmethod
+    def from_forecast(cls, day: DailyForecast) -> "ForecastSnapshot":
+        return cls(**day)
+
+    def to_forecast(self) -> DailyForecast:
+        return DailyForecast(
+            date=self.date,
+            high=self.high,
+            low=self.low,
+            description=self.description,
+            pop=self.pop,
+            rain=self.rain,
+            snow=self.snow,
+        )
+
+    def to_row(self) -> list[Any]:
+        return [
+            encode_datetime(self.date),
+            self.high,
+            self.low,
+            self.description,
+            self.pop,
+            self.rain,
+            self.snow,
+        ]
+
+    @classmethod
+    def from_row(cls, row: list[Any]) -> "ForecastSnapshot":
+        date, *rest = row
+        return cls(decode_datetime(date), *rest)
+
+
+@dataclass(frozen=True, slots=True)
+class WeatherSnapshot:
+    """Immutable snapshot of the weather stage's WeatherData."""
+
+    current: CurrentWeatherSnapshot
+    today: DailyWeatherSnapshot
+    upcoming: tuple[ForecastSnapshot, ...]
+    sunrise: datetime
+    sunset: datetime
+    moonrise: datetime | None
+    moonset: datetime | None
+    moon_phase: float
+
+    @classmethod
+    def from_weather_data(cls, weather_data: WeatherData) -> "WeatherSnapshot":
+        return cls(
+            current=CurrentWeatherSnapshot.from_current(weather_data["current"]),
+            today=DailyWeatherSnapshot.from_daily(weather_data["today"]),
+            upcoming=tuple(ForecastSnapshot.from_forecast(day) for day in weather_data["upcoming"]),
+            sunrise=weather_data["sunrise"],
+            sunset=weather_data["sunset"],
+            moonrise=weather_data["moonrise"],
+            moonset=weather_data["moonset"],
+            moon_phase=weather_data["moon_phase"],
+        )
+
+    def to_weather_data(self) -> WeatherData:
+        return WeatherData(
+            current=self.current.to_current(),
+            today=self.today.to_daily(),
+            upcoming=[day.to_forecast() for day in self.upcoming],
+            sunrise=self.sunrise,
+            sunset=self.sunset,
+            moonrise=self.moonrise,
+            moonset=self.moonset,
+            moon_phase=self.moon_phase,
+        )
+
+    def to_row(self) -> list[Any]:
+        return [
+            self.current.to_row(),
+            self.today.to_row(),
+            [day.to_row() for day in self.upcoming],
+            encode_datetime(self.sunrise),
+            encode_datetime(self.sunset),
+            encode_datetime(self.moonrise) if self.moonrise else None,
+            encode_datetime(self.moonset) if self.moonset else None,
+            self.moon_phase,
+        ]
+
+    @classmethod
+    def from_row(cls, row: list[Any]) -> "WeatherSnapshot":
+        current, today, upcoming, sunrise, sunset, moonrise, moonset, moon_phase = row
+        return cls(
+            current=CurrentWeatherSnapshot.from_row(current),
+            today=DailyWeatherSnapshot.from_row(today),
+            upcoming=tuple(ForecastSnapshot.from_row(day) for day in upcoming),
+            sunrise=decode_datetime(sunrise),
+            sunset=decode_datetime(sunset),
+            moonrise=decode_datetime(moonrise) if moonrise else None,
+            moonset=decode_datetime(moonset) if moonset else None,
+            moon_phase=moon_phase,
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class NationalDaySnapshot:
+    """Immutable snapshot of a NationalDay, including any enrichment details."""
+
+    name: str
+    url: str
+    occurrence_text: str | None = None
+    summary: str | None = None
+    history: str | None = None
+
+    @classmethod
+    def from_national_day(cls, day: NationalDay) -> "NationalDaySnapshot":
+        return cls(day.name, day.url, day.occurrence_text, day.summary, day.history)
+
+    def to_national_day(self) -> NationalDay:
+        return NationalDay(self.name, self.url, self.occurrence_text, self.summary, self.history)
+
+    def to_row(self) -> list[Any]:
+        return [self.name, self.url, self.occurrence_text, self.summary, self.history]
+
+    @classmethod
+    def from_row(cls, row: list[Any]) -> "NationalDaySnapshot":
+        return cls(*row)
+
+
+def dumps(kind: str, row: list[Any]) -> str:
+    return json.dumps([SNAPSHOT_VERSION, kind, row], separators=(",", ":"), ensure_ascii=False)
+
+
+def loads(kind: str, payload: str) -> Any:
+    """Unwrap a payload's row, checking its codec version and kind."""
+    try:
+        version, payload_kind, row = json.loads(payload)
+    except (ValueError, TypeError) as e:
+        raise SnapshotError(f"Malformed snapshot: {e}") from e
+    if version != SNAPSHOT_VERSION:
+        raise SnapshotError(f"Unsupported snapshot version {version}")
+    if payload_kind != kind:
+        raise SnapshotError(f"Expected a {kind} snapshot, got {payload_kind}")
+    return row
+
+
+def encode_weather(weather_data: WeatherData) -> str:
+    """Encode weather data as a compact snapshot payload."""
+    return dumps(WEATHER_KIND, WeatherSnapshot.from_weather_data(weather_data).to_row())
+
+
+def decode_weather(payload: str) -> WeatherData:
+    """
+    Decode weather data from a snapshot payload.
+
+    Raises:
+        SnapshotError: If the payload is malformed or from another codec version
+    """
+    try:
+        return WeatherSnapshot.from_row(loads(WEATHER_KIND, payload)).to_weather_data()
+    except SnapshotError:
+        raise
+    except (ValueError, TypeError, KeyError, pytz.UnknownTimeZoneError, ZoneInfoNotFoundError) as e:
+        raise SnapshotError(f"Malformed weather snapshot: {e}") from e
+
+
+def encode_national_days(national_days: list[NationalDay]) -> str:
+    """Encode national days, with their enrichment details, as a compact snapshot payload."""
+    return dumps(
+        NATIONAL_DAYS_KIND,
+        [NationalDaySnapshot.from_national_day(day).to_row() for day in national_days],
+    )
+
+
+def decode_national_days(payload: str) -> list[NationalDay]:
+    """
+    Decode national days from a snapshot payload.
+
+    Raises:
+        SnapshotError: If the payload is malformed or from another codec version
+    """
+    try:
+        rows = loads(NATIONAL_DAYS_KIND, payload)
+        return [NationalDaySnapshot.from_row(row).to_national_day() for row in rows]
+    except SnapshotError:
+        raise
+    except (ValueError, TypeError) as e:
+        raise SnapshotError(f"Malformed national days snapshot: {e}") from e
@@ -0,0 +1,183 @@
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import time
+from collections.abc import Callable
+from functools import cache
+from pathlib import Path
+from typing import Any, Protocol
+
+import boto3
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STATE_DIR = "/tmp/felix-pearl-state"
+UPDATE_ATTEMPTS = 5  # Conditional writes tried before an update gives up
+
+Updater = Callable[[dict[str, Any] | None], dict[str, Any]]
+
+
+class StoreConflictError(RuntimeError):
+    """Raised when an update keeps losing to concurrent writers."""
+
+
+class StateStore(Protocol):
+    """A small key-value store for state that has to outlive a single invocation."""
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        """Return the value stored under key, or None if it's missing or expired."""
+        ...
+
+    def put(self, key: str, value: dict[str, Any], ttl_seconds: int | None = None) -> None:
+        """Store a value under key, optionally expiring after ttl_seconds."""
+        ...
+
+    def update(self, key: str, func: Updater, ttl_seconds: int | None = None) -> dict[str, Any]:
+        """
+        Atomically replace the value under key with func(current value), so concurrent
+        read-modify-writes never lose each other's changes. func may be called more than
+        once and must not have side effects.
+
+        Returns:
+            The value written
+
+        Raises:
+            StoreConflictError: If the write kept conflicting with other writers
+        """
+        ...
+
+
+class FileStore:
+    """
+    State store backed by one JSON file per key in a local directory.
+    Survives retries within a warm Lambda container and runs on a single host.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+
+    def _path(self, key: str) -> Path:
+        digest = hashlib.sha256(key.encode()).hexdigest()
+        return self.directory / f"{digest}.json"
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        try:
+            with open(self._path(key)) as f:
+                item = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+        expires_at = item.get("expires_at")
+        if expires_at is not None and expires_at <= time.time():
+            return None
+        return item["value"]
+
+    def put(self, key: str, value: dict[str, Any], ttl_seconds: int | None = None) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._write(key, value, ttl_seconds)
+
+    def update(self, key: str, func: Updater, ttl_seconds: int | None = None) -> dict[str, Any]:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # An exclusive lock on a sidecar file serializes updates across threads and processes
+        with open(self._path(key).with_suffix(".lock"), "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            value = func(self.get(key))
+            self._write(key, value, ttl_seconds)
+        return value
+
+    def _write(self, key: str, value: dict[str, Any], ttl_seconds: int | None) -> None:
+        item = {
+            "key": key,
+            "value": value,
+            "expires_at": time.time() + ttl_seconds if ttl_seconds is not None else None,
+        }
+        # Write to a temporary file and rename so readers never see a partial write
+        path = self._path(key)
+        tmp_path = path.with_suffix(f".{os.getpid()}.{time.monotonic_ns()}.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(item, f)
+        os.replace(tmp_path, path)
+
+
+class DynamoDBStore:
+    """
+    State store backed by a DynamoDB table shared by every invocation.
+
+    The table needs a string partition key named "key". Enable DynamoDB TTL on the
+    "expires_at" attribute to have expired items cleaned up automatically. Items
+    written by update() carry a "version" attribute for optimistic locking.
+    """
+
+    def __init__(self, table_name: str):
+        self.table = boto3.resource("dynamodb").Table(table_name)
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        return self._value(self.table.get_item(Key={"key": key}, ConsistentRead=True).get("Item"))
+
+    def _value(self, item: dict[str, Any] | None) -> dict[str, Any] | None:
+        if not item:
+            return None
+
+        # DynamoDB TTL deletion is lazy, so expired items can still be returned
+        expires_at = item.get("expires_at")
+        if expires_at is not None and int(expires_at) <= time.time():
+            return None
+        return json.loads(str(item["value"]))
+
+    def put(self, key: str, value: dict[str, Any], ttl_seconds: int | None = None) -> None:
+        item: dict[str, Any] = {"key": key, "value": json.dumps(value)}
+        if ttl_seconds is not None:
+            item["expires_at"] = int(time.time() + ttl_seconds)
+        self.table.put_item(Item=item)
+
+    def update(self, key: str, func: Updater, ttl_seconds: int | None = None) -> dict[str, Any]:
+        for _ in range(UPDATE_ATTEMPTS):
+            item = self.table.get_item(Key={"key": key}, ConsistentRead=True).get("Item")
+            value = func(self._value(item))
+            version = int(item["version"]) if item and "version" in item else 0
+            new_item: dict[str, Any] = {
+                "key": key,
+                "value": json.dumps(value),
+                "version": version + 1,
+            }
+            if ttl_seconds is not None:
+                new_item["expires_at"] = int(time.time() + ttl_seconds)
+
+            # Only write if nobody else has written since the read
+            condition: dict[str, Any]
+            if item is None:
+                condition = {
+                    "ConditionExpression": "attribute_not_exists(#key)",
+                    "ExpressionAttributeNames": {"#key": "key"},
+                }
+            elif "version" not in item:
+                condition = {
+                    "ConditionExpression": "attribute_not_exists(#version)",
+                    "ExpressionAttributeNames": {"#version": "version"},
+                }
+            else:
+                condition = {
+                    "ConditionExpression": "#version = :version",
+                    "ExpressionAttributeNames": {"#version": "version"},
+                    "ExpressionAttributeValues": {":version": version},
+                }
+            try:
+                self.table.put_item(Item=new_item, **condition)
+                return value
+            except self.table.meta.client.exceptions.ConditionalCheckFailedException:
+                logger.info("🔁 Concurrent write to %s, retrying", key)
+        raise StoreConflictError(f"Gave up updating {key} after {UPDATE_ATTEMPTS} conflicts")
+
+
+@cache
+def get_store() -> StateStore:
+    """
+    Get the configured state store.
+    Uses the DynamoDB table named by STATE_TABLE if set, otherwise files under STATE_DIR.
+    """
+    if table_name := os.environ.get("STATE_TABLE"):
+        logger.info("🗄️ Using DynamoDB state store: %s", table_name)
+        return DynamoDBStore(table_name)
+    return FileStore(os.environ.get("STATE_DIR", DEFAULT_STATE_DIR))
@@ -0,0 +1,30 @@
+import math
+import re
+
+TOKEN_PATTERN = re.compile(r"[A-Za-z]+|\d+|\s+|[^\sA-Za-z\d]")
+CHARS_PER_WORD_TOKEN = 4
+DIGITS_PER_TOKEN = 3
+BYTES_PER_SYMBOL_TOKEN = 2
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the number of tokens in text.
+
+    Words count one token per ~4 letters, digit runs one per 3 digits, ASCII
+    punctuation one each, and other symbols (emojis, degree signs) roughly one
+    token per two UTF-8 bytes. Whitespace is folded into the following token.
+    """
+    tokens = 0
+    for piece in TOKEN_PATTERN.findall(text):
+        if piece.isspace():
+            continue
+        if piece.isalpha():
+            tokens += math.ceil(len(piece) / CHARS_PER_WORD_TOKEN)
+        elif piece.isdigit():
+            tokens += math.ceil(len(piece) / DIGITS_PER_TOKEN)
+        elif piece.isascii():
+            tokens += 1
+        else:
+            tokens += max(1, len(piece.encode()) // BYTES_PER_SYMBOL_TOKEN)
+    return tokens